@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Shared CRCs used by the validation scripts.
+
+garmin_crc is the CRC the FIT spec defines (garmin_header_crc is the same
+CRC, specialised for file headers); crc16_ccitt is the CRC-16/CCITT
+(poly 0x1021) our Dart writer used; crc16_ccitt_low_byte is the table
+variant the older validators check; crc16_cc01 is the file CRC the Python
+generators in tools/ write. This is the only copy: scripts in this
+folder import it directly, and those in tools/ and test_data/ add the
+repository root to sys.path first:
+    from fit_crc import garmin_crc, garmin_header_crc, crc16_ccitt, crc16_ccitt_low_byte, crc16_cc01
+"""
+import binascii
+import struct
+
+
+def _make_crc_tables(count):
+    """Build slicing tables for Garmin's CRC (reflected poly 0xA001).
+
+    tables[0] is the usual byte-at-a-time table; tables[k][b] is the CRC
+    contribution of byte b followed by k zero bytes. The tables are built
+    in reflected (LSB-first) form, so input bytes are folded in as they are,
+    with no bit reversal per byte.
+    """
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    tables = [table]
+    for _ in range(count - 1):
+        prev = tables[-1]
+        tables.append([(c >> 8) ^ table[c & 0xFF] for c in prev])
+    return tables
+
+
+_CRC_TABLES = _make_crc_tables(16)
+_BLOCK = struct.Struct('16B')
+
+
+def garmin_crc(data, crc=0):
+    """Calculate the FIT CRC, as Garmin's nibble-based FitCRC_Get16 does.
+
+    Whole 16-byte blocks are folded in with one lookup per byte into 16
+    tables (slice-by-16), the tail one byte at a time. Pass the result of a
+    previous call as ``crc`` to continue over more bytes.
+    """
+    (t0, t1, t2, t3, t4, t5, t6, t7,
+     t8, t9, t10, t11, t12, t13, t14, t15) = _CRC_TABLES
+    view = memoryview(data)
+    split = len(view) & ~15
+    if split:
+        for (b0, b1, b2, b3, b4, b5, b6, b7,
+             b8, b9, b10, b11, b12, b13, b14, b15) in _BLOCK.iter_unpack(view[:split]):
+            crc = (t15[(crc & 0xFF) ^ b0] ^ t14[(crc >> 8) ^ b1] ^ t13[b2] ^ t12[b3]
+                   ^ t11[b4] ^ t10[b5] ^ t9[b6] ^ t8[b7] ^ t7[b8] ^ t6[b9] ^ t5[b10]
+                   ^ t4[b11] ^ t3[b12] ^ t2[b13] ^ t1[b14] ^ t0[b15])
+    for byte in view[split:]:
+        crc = (crc >> 8) ^ t0[(crc ^ byte) & 0xFF]
+    return crc
+
+
+# Every file the generators in this folder write starts with these header
+# bytes: header size 14, protocol 2.0, profile 2163 (written big-endian)
+_HEADER_PREFIX = b'\x0e\x20\x08\x73'
+_HEADER_PREFIX_CRC = garmin_crc(_HEADER_PREFIX)
+
+
+def garmin_header_crc(header):
+    """Calculate the FIT CRC of the header bytes that precede the header CRC.
+
+    Same result as garmin_crc(header); a header starting with the usual
+    prefix resumes from its precomputed CRC, so only the data size and
+    '.FIT' bytes are folded in.
+    """
+    view = memoryview(header)
+    if view[:4] == _HEADER_PREFIX:
+        return garmin_crc(view[4:], _HEADER_PREFIX_CRC)
+    return garmin_crc(view)
+
+
+def crc16_ccitt(data, crc=0):
+    """Calculate CRC-16/CCITT (poly 0x1021) like the Dart implementation.
+
+    Pass the result of a previous call as ``crc`` to continue over more bytes.
+    binascii.crc_hqx is the same CRC (XMODEM form), implemented in C.
+    """
+    return binascii.crc_hqx(data, crc)
+
+
+def _make_ccitt_table():
+    """Build the byte-at-a-time table for CRC-16/CCITT (poly 0x1021)."""
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+        table.append(crc)
+    return table
+
+
+def _make_low_byte_tables(table):
+    """Tables for folding crc16_ccitt_low_byte 4 bytes at a time.
+
+    Each step only carries the low byte of the checksum forward, and that
+    low byte evolves as low = table[low ^ byte] & 0xFF, which is linear.
+    tables[k - 1][x] applies that k times, so the first three bytes of a
+    word can be looked up independently and XORed together.
+    """
+    step = [entry & 0xFF for entry in table]
+    tables = [step]
+    for _ in range(2):
+        tables.append([step[x] for x in tables[-1]])
+    return tables
+
+
+_CCITT_TABLE = _make_ccitt_table()
+_LOW_BYTE_TABLES = _make_low_byte_tables(_CCITT_TABLE)
+
+
+def crc16_ccitt_low_byte(data, crc=0):
+    """Calculate the CCITT-table checksum validate_fit.py and verify_crc.py use.
+
+    It indexes the CRC-16/CCITT table with the low byte of the running CRC
+    rather than the high one, so it is not crc16_ccitt; kept as-is because
+    files written by the earlier generators carry it. Whole 4-byte words
+    are folded in with one lookup per byte (slice-by-4), the tail one byte
+    at a time. Pass the result of a previous call as ``crc`` to continue
+    over more bytes.
+    """
+    table = _CCITT_TABLE
+    low1, low2, low3 = _LOW_BYTE_TABLES
+    split = len(data) & ~3
+    for b0, b1, b2, b3 in zip(data[0:split:4], data[1:split:4],
+                              data[2:split:4], data[3:split:4]):
+        low = low3[(crc & 0xFF) ^ b0] ^ low2[b1] ^ low1[b2]
+        crc = (low << 8) ^ table[low ^ b3]
+    for byte in data[split:]:
+        low = crc & 0xFF
+        crc = (low << 8) ^ table[low ^ byte]
+    return crc
+
+
+def _make_cc01_table():
+    """Eight shift/XOR rounds of the 0xCC01 CRC for every possible high byte."""
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0xCC01) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+        table.append(crc)
+    return tuple(table)
+
+
+def _make_cc01_word_table(table):
+    """Four steps of crc16_cc01 at once, for the last byte of each 4-byte word.
+
+    A byte fed in lands in the high half of the CRC and is shifted out by the
+    next step without ever reaching the table index, so of each word only
+    the last byte survives: crc = (word[3] << 8) ^ word_table[crc & 0xFF].
+    """
+    word_table = []
+    for low in range(256):
+        for _ in range(3):
+            low = table[low] & 0xFF
+        word_table.append(table[low])
+    return tuple(word_table)
+
+
+_CC01_TABLE = _make_cc01_table()
+_CC01_WORD_TABLE = _make_cc01_word_table(_CC01_TABLE)
+
+
+def crc16_cc01(data, crc=0):
+    """Calculate the file CRC the Python FIT generators in tools/ write.
+
+    Their original loop shifted each byte into the low end of the CRC and ran
+    eight MSB-first rounds with 0xCC01. The byte only lands in the low byte,
+    so a whole step is (byte << 8) ^ table[previous crc & 0xFF], and four
+    steps are one lookup per 4-byte word (slice-by-4). Pass the result of a
+    previous call as ``crc`` to continue over more bytes.
+    """
+    table = _CC01_TABLE
+    word_table = _CC01_WORD_TABLE
+    split = len(data) & ~3
+    for byte in data[3:split:4]:
+        crc = (byte << 8) ^ word_table[crc & 0xFF]
+    for byte in data[split:]:
+        crc = (byte << 8) ^ table[crc & 0xFF]
+    return crc
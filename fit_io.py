@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Shared FIT file loading for the verify and validate scripts.
+
+load_fit returns a file's contents, cached per process on the file's path,
+size and modification time: checking the same file again is a dictionary
+lookup, and a file that has been rewritten is read afresh. Import from
+scripts in this folder (tools/ scripts add the repository root to sys.path):
+    from fit_io import load_fit
+"""
+import functools
+import os
+
+
+def load_fit(path):
+    """Return the contents of the FIT file at path as bytes."""
+    st = os.stat(path)
+    return _read(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=64)
+def _read(path, mtime_ns, size):
+    # mtime_ns and size are only part of the cache key
+    with open(path, 'rb') as f:
+        return f.read()
@@ -6,6 +6,8 @@ Hand-crafted for maximum compatibility.
 
 import struct
 
+from fit_crc import garmin_crc, garmin_header_crc
+
 def write_uint8(b, v):
     b.append(v & 0xFF)
 
@@ -30,26 +32,6 @@ def write_sint32_be(b, v):
         v = (1 << 32) + v  # Two's complement
     write_uint32_be(b, v)
 
-def garmin_fit_crc(data):
-    """Garmin FIT CRC (nibble-based, NOT CRC-16/CCITT)"""
-    crc_table = [
-        0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
-        0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400,
-    ]
-    
-    crc = 0
-    for byte in data:
-        # compute checksum of lower four bits of byte
-        tmp = crc_table[crc & 0xF]
-        crc = (crc >> 4) & 0x0FFF
-        crc = crc ^ tmp ^ crc_table[byte & 0xF]
-        
-        # now compute checksum of upper four bits of byte
-        tmp = crc_table[crc & 0xF]
-        crc = (crc >> 4) & 0x0FFF
-        crc = crc ^ tmp ^ crc_table[(byte >> 4) & 0xF]
-    return crc
-
 def create_comprehensive_fit():
     """Create a comprehensive Strava-compatible FIT file"""
     
@@ -136,7 +118,7 @@ def create_comprehensive_fit():
                    (data_size >> 8) & 0xFF, data_size & 0xFF]
     
     # Calculate header CRC (stored in LITTLE ENDIAN as per Garmin spec)
-    header_crc = garmin_fit_crc(header[:12])
+    header_crc = garmin_header_crc(bytes(header[:12]))
     header[12] = header_crc & 0xFF          # Low byte first (little-endian)
     header[13] = (header_crc >> 8) & 0xFF   # High byte second
     
@@ -144,7 +126,7 @@ def create_comprehensive_fit():
     full_file = header + data_msg
     
     # Calculate file CRC (stored in LITTLE ENDIAN as per Garmin spec)
-    file_crc = garmin_fit_crc(full_file)
+    file_crc = garmin_crc(bytes(full_file))
     full_file.append(file_crc & 0xFF)         # Low byte first (little-endian)
     full_file.append((file_crc >> 8) & 0xFF)  # High byte second
     
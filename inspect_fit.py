@@ -104,23 +104,8 @@ print(f'CRC at end: {crc_bytes.hex()} = {crc_val}')
 
 # Calculate CRC of payload[:-2]
 from fit_summary_fixed import *  # Import the CRC function if available
-# Or use a simple nibble-based CRC
-FIT_CRC_TABLE = [
-    0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
-    0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400,
-]
+from fit_crc import garmin_crc
 
-def calc_crc(data):
-    crc = 0
-    for byte in data:
-        tmp = FIT_CRC_TABLE[crc & 0xF]
-        crc = (crc >> 4) & 0x0FFF
-        crc = crc ^ tmp ^ FIT_CRC_TABLE[byte & 0xF]
-        tmp = FIT_CRC_TABLE[crc & 0xF]
-        crc = (crc >> 4) & 0x0FFF
-        crc = crc ^ tmp ^ FIT_CRC_TABLE[(byte >> 4) & 0xF]
-    return crc
-
-calculated_crc = calc_crc(payload[:-2])
+calculated_crc = garmin_crc(payload[:-2])
 print(f'Calculated CRC: {calculated_crc} (expected {crc_val})')
 print(f'CRC match: {calculated_crc == crc_val}')
@@ -36,36 +36,14 @@ FIT_UINT16 FitCRC_Get16(FIT_UINT16 crc, FIT_UINT8 byte)
 THIS IS THE ACTUAL GARMIN CRC ALGORITHM!
 """
 
-def fit_crc_get16(crc, byte):
-    """
-    The ACTUAL Garmin FIT CRC algorithm
-    This is different from CRC-16/CCITT!
-    """
-    crc_table = [
-        0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
-        0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400
-    ]
-    
-    # compute checksum of lower four bits of byte
-    tmp = crc_table[crc & 0xF]
-    crc = (crc >> 4) & 0x0FFF
-    crc = crc ^ tmp ^ crc_table[byte & 0xF]
-    
-    # now compute checksum of upper four bits of byte
-    tmp = crc_table[crc & 0xF]
-    crc = (crc >> 4) & 0x0FFF
-    crc = crc ^ tmp ^ crc_table[(byte >> 4) & 0xF]
-    
-    return crc
-
-def garmin_fit_crc(data):
-    """Calculate Garmin FIT CRC over data"""
-    crc = 0
-    for byte in data:
-        crc = fit_crc_get16(crc, byte)
-    return crc
-
+import os
 import struct
+import sys
+
+# fit_crc.py lives at the repository root, one level up; its garmin_crc is a
+# table-driven form of FitCRC_Get16 above and gives the same result
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import garmin_crc
 
 def validate_with_garmin_crc(filepath):
     """Validate a FIT file using the ACTUAL Garmin CRC algorithm"""
@@ -83,8 +61,8 @@ def validate_with_garmin_crc(filepath):
     file_crc_stored = struct.unpack('<H', data[-2:])[0]      # Little Endian!
     
     # Calculate CRCs using Garmin algorithm
-    header_crc_calc = garmin_fit_crc(data[:12])
-    file_crc_calc = garmin_fit_crc(data[:-2])
+    header_crc_calc = garmin_crc(data[:12])
+    file_crc_calc = garmin_crc(data[:-2])
     
     return {
         'size': len(data),
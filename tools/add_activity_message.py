@@ -1,18 +1,13 @@
 #!/usr/bin/env python3
 """Add activity message to FIT file and fix CRC"""
+import os
 import struct
+import sys
 from datetime import datetime
 
-def crc16_ccitt(data):
-    crc = 0
-    for b in data:
-        crc ^= (b << 8) & 0xFFFF
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return crc
+# fit_crc.py lives at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import crc16_ccitt
 
 def write_uint8(data, val):
     data.append(val & 0xFF)
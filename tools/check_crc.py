@@ -1,17 +1,12 @@
 #!/usr/bin/env python3
 """Check FIT file CRC"""
 
-def crc16_ccitt(data):
-    """Calculate CRC-16/CCITT (polynomial 0x1021)"""
-    crc = 0
-    for byte in data:
-        crc ^= (byte << 8)
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return crc
+import os
+import sys
+
+# fit_crc.py lives at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import crc16_ccitt
 
 with open('minimal_test.fit', 'rb') as f:
     data = f.read()
@@ -1,25 +1,19 @@
 #!/usr/bin/env python3
 """Debug CRC calculation for FIT files."""
+import os
 import struct
+import sys
 
-def crc16_ccitt(data):
-    """Calculate CRC-16/CCITT (poly 0x1021) like Dart implementation."""
-    crc = 0
-    for byte in data:
-        crc ^= (byte << 8) & 0xFFFF
-        for _ in range(8):
-            if (crc & 0x8000) != 0:
-                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return crc & 0xFFFF
+# fit_crc.py lives at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import crc16_ccitt
 
 # Read file (auto-detect newest)
-import os
-import glob
 test_data = r'd:\TYRE PREASSURE APP\tyre_preassure\test_data'
-fit_files = glob.glob(f'{test_data}/*.fit')
-path = max(fit_files, key=os.path.getmtime)
+# One directory scan; DirEntry.stat() reuses the listing's metadata on Windows
+with os.scandir(test_data) as it:
+    path = max((e for e in it if e.name.lower().endswith('.fit') and e.is_file()),
+               key=lambda e: e.stat().st_mtime).path
 print(f"Analyzing: {os.path.basename(path)}")
 with open(path, 'rb') as f:
     data = f.read()
@@ -37,8 +31,9 @@ print(f"Data section: {len(data_section)} bytes")
 print(f"File CRC field: {' '.join(f'{b:02x}' for b in file_crc_bytes)}")
 print()
 
-# Header CRC (first 12 bytes)
+# Header CRC (first 12 bytes) - also the running state for the file CRC
 header_crc_computed = crc16_ccitt(header[:12])
+header_prefix_crc = crc16_ccitt(header[12:14], header_crc_computed)
 header_crc_stored = struct.unpack('<H', header[12:14])[0]
 print(f"Header CRC (bytes 0-11):")
 print(f"  Computed: 0x{header_crc_computed:04X}")
@@ -47,7 +42,7 @@ print(f"  Match: {header_crc_computed == header_crc_stored}")
 print()
 
 # File CRC (should be over data section only, NOT including header)
-file_crc_computed_wrong = crc16_ccitt(data[:-2])  # What Dart code does (includes header)
+file_crc_computed_wrong = crc16_ccitt(data_section, header_prefix_crc)  # What Dart code does (includes header)
 file_crc_computed_correct = crc16_ccitt(data_section)  # What it SHOULD do (data only)
 file_crc_stored = struct.unpack('<H', file_crc_bytes)[0]
 
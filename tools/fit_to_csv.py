@@ -26,6 +26,69 @@ except Exception:
     sys.exit(2)
 
 
+# Rows per writerows() call; keeps the csv C loop busy without holding a whole file
+ROW_BATCH = 1024
+
+
+def _fmt(v):
+    """Represent lists and dicts in a readable way."""
+    if isinstance(v, (list, tuple)):
+        return '|'.join(map(str, v))
+    if isinstance(v, dict):
+        return ';'.join(f"{k}={v[k]}" for k in v)
+    return v
+
+
+def _open_csv(out_dir, basename, name, fields):
+    """Open a temporary CSV for a message type and write its initial header."""
+    out_path = os.path.join(out_dir, f"{basename}_{name}.csv")
+    tmp_path = out_path + '.tmp'
+    try:
+        fh = open(tmp_path, 'w', newline='', encoding='utf-8')
+    except Exception as e:
+        print(f'Failed to write {out_path}: {e}', file=sys.stderr)
+        return None
+
+    # Header is the union of field names, in the order first seen
+    header = []
+    for f in fields:
+        if f.name not in header:
+            header.append(f.name)
+    writer = csv.writer(fh)
+    writer.writerow(['message_name'] + header)
+    return {
+        'path': out_path,
+        'tmp_path': tmp_path,
+        'fh': fh,
+        'writer': writer,
+        'header': header,
+        # Column position of each field (column 0 is the message name)
+        'header_idx': {h: i for i, h in enumerate(header, 1)},
+        'count': 0,
+        'rewrite': False,
+        # Rows waiting for the next writerows() call
+        'pending': [],
+    }
+
+
+def _finish_csv(out):
+    """Move a temporary CSV into place, fixing its header first if it grew."""
+    if not out['rewrite']:
+        os.replace(out['tmp_path'], out['path'])
+        return
+
+    # Stream the rows across with the final header, padding short rows
+    width = 1 + len(out['header'])
+    with open(out['tmp_path'], newline='', encoding='utf-8') as src, \
+            open(out['path'], 'w', newline='', encoding='utf-8') as dst:
+        rows = csv.reader(src)
+        next(rows)  # initial header
+        writer = csv.writer(dst)
+        writer.writerow(['message_name'] + out['header'])
+        writer.writerows(row + [''] * (width - len(row)) for row in rows)
+    os.remove(out['tmp_path'])
+
+
 def write_csv_for_messages(fitfile_path, out_dir, verbose=False):
     if verbose:
         print('Python executable:', sys.executable)
@@ -40,63 +103,83 @@ def write_csv_for_messages(fitfile_path, out_dir, verbose=False):
     basename = os.path.splitext(os.path.basename(fitfile_path))[0]
     os.makedirs(out_dir, exist_ok=True)
 
-    # Collect messages grouped by name
-    groups = OrderedDict()
+    # Stream each message straight into a temporary CSV for its message type.
+    # The header is written from the first message of each type; if later
+    # messages bring new fields, the header is fixed when the file is moved
+    # into place.
+    outputs = OrderedDict()
     msg_count = 0
+    parsed = False
     try:
         for msg in fit.get_messages():
-            groups.setdefault(msg.name, []).append(msg)
             msg_count += 1
+            name = msg.name
+            # Fetch the field list once and reuse it for header and row
+            fields = msg.fields
+            if name not in outputs:
+                outputs[name] = _open_csv(out_dir, basename, name, fields)
+            out = outputs[name]
+            if out is None:
+                continue
+
+            header = out['header']
+            header_idx = out['header_idx']
+            values = []
+            for f in fields:
+                i = header_idx.get(f.name)
+                if i is None:
+                    header.append(f.name)
+                    i = header_idx[f.name] = len(header)
+                    out['rewrite'] = True
+                values.append((i, f.value))
+
+            row = [None] * (1 + len(header))
+            row[0] = name
+            for i, v in values:
+                row[i] = _fmt(v)
+            pending = out['pending']
+            pending.append(row)
+            if len(pending) >= ROW_BATCH:
+                out['writer'].writerows(pending)
+                pending.clear()
+            out['count'] += 1
+        parsed = True
     except Exception as e:
         import traceback
         print('Error while iterating messages:', file=sys.stderr)
         traceback.print_exc()
+    finally:
+        for out in outputs.values():
+            if out is not None:
+                out['writer'].writerows(out['pending'])
+                out['fh'].close()
+                if not parsed:
+                    os.remove(out['tmp_path'])
+
+    if not parsed:
         return False
 
     if verbose:
         print('Total messages parsed:', msg_count)
 
     # If no messages found, warn and return
-    if not groups:
+    if not outputs:
         print('No messages found in FIT file. The file may be empty or corrupted.', file=sys.stderr)
         return False
 
     created_files = []
     summary = []
 
-    for name, msgs in groups.items():
-        out_path = os.path.join(out_dir, f"{basename}_{name}.csv")
-        # Build header from union of field names preserving order seen
-        header = []
-        for m in msgs:
-            for f in m.fields:
-                if f.name not in header:
-                    header.append(f.name)
-
-        # Write CSV
+    for name, out in outputs.items():
+        if out is None:
+            continue
+        out_path = out['path']
         try:
-            with open(out_path, 'w', newline='', encoding='utf-8') as fh:
-                writer = csv.writer(fh)
-                writer.writerow(['message_name'] + header)
-
-                for m in msgs:
-                    row = [m.name]
-                    # Build a map for quick lookup
-                    fv = {f.name: f.value for f in m.fields}
-                    for h in header:
-                        v = fv.get(h)
-                        # Represent lists and dicts in a readable way
-                        if isinstance(v, (list, tuple)):
-                            v = '|'.join(map(str, v))
-                        elif isinstance(v, dict):
-                            v = ';'.join(f"{k}={v[k]}" for k in v)
-                        row.append(v)
-                    writer.writerow(row)
-
+            _finish_csv(out)
             created_files.append(out_path)
-            summary.append((name, len(msgs)))
+            summary.append((name, out['count']))
             if verbose:
-                print(f'Wrote {out_path} ({len(msgs)} messages)')
+                print(f'Wrote {out_path} ({out["count"]} messages)')
         except Exception as e:
             print(f'Failed to write {out_path}: {e}', file=sys.stderr)
 
@@ -106,8 +189,7 @@ def write_csv_for_messages(fitfile_path, out_dir, verbose=False):
         with open(summary_path, 'w', newline='', encoding='utf-8') as sf:
             writer = csv.writer(sf)
             writer.writerow(['message_name', 'count'])
-            for name, cnt in summary:
-                writer.writerow([name, cnt])
+            writer.writerows(summary)
         if verbose:
             print('Wrote summary:', summary_path)
         created_files.append(summary_path)
@@ -17,22 +17,38 @@ except Exception:
     sys.exit(2)
 
 
+# Messages are printed in batches; one print() per message dominates on large files
+FLUSH_EVERY = 4096
+
+
+def _flush(lines):
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
+        lines.clear()
+
+
 def main(path):
     print('Using fitdecode to parse:', path)
+    lines = []
     try:
         with fitdecode.FitReader(path) as fr:
             for i, msg in enumerate(fr):
                 try:
                     if hasattr(msg, 'name'):
-                        print(f'{i}: {msg.name}')
+                        lines.append(f'{i}: {msg.name}')
                     else:
-                        print(f'{i}: {type(msg)}')
+                        lines.append(f'{i}: {type(msg)}')
                 except Exception as e:
-                    print('Error printing message', i, e)
+                    lines.append(f'Error printing message {i} {e}')
+                if len(lines) >= FLUSH_EVERY:
+                    _flush(lines)
     except Exception as e:
         import traceback
+        _flush(lines)
         print('fitdecode raised:', e)
+        sys.stdout.flush()
         traceback.print_exc()
+    _flush(lines)
 
 
 if __name__ == '__main__':
@@ -1,17 +1,11 @@
 #!/usr/bin/env python3
 """Fix CRC in malformed FIT file"""
 import sys
+import os
 
-def crc16_ccitt(data):
-    crc = 0
-    for b in data:
-        crc ^= (b << 8) & 0xFFFF
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return crc
+# fit_crc.py lives at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import crc16_ccitt
 
 # Read file
 with open(r'..\test_data\coast_down_20260129_225448.fit', 'rb') as f:
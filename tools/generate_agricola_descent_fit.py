@@ -16,9 +16,15 @@ import struct
 import json
 import math
 import random
+import os
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+# fit_crc.py lives at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import crc16_cc01
+
 # FIT file constants
 FIT_HEADER_SIZE = 14
 FIT_PROTOCOL_VERSION = 0x20
@@ -29,32 +35,36 @@ DATA_TYPE_LAP = 21
 DATA_TYPE_SESSION = 34
 DATA_TYPE_ACTIVITY = 34
 
+# Pre-compiled message layouts
+_FILE_ID_S = struct.Struct('<BHHHQ')
+_RECORD_S = struct.Struct('<IiiIIBH')
+_LAP_S = struct.Struct('<IIIIIIHHHH')
+_SESSION_S = _LAP_S
+_HDR_PROFILE_S = struct.Struct('<H')
+_HDR_SIZE_S = struct.Struct('<I')
+_CRC_S = struct.Struct('<H')
+
 class FITFileWriter:
     def __init__(self, filepath):
         self.filepath = filepath
-        self.data_buffer = b''
+        self.data_buffer = bytearray()
         self.crc = 0
         
-    def _crc16(self, data):
-        """Calculate CRC16 for FIT data."""
-        crc = 0
-        for byte in data:
-            crc = ((crc << 8) ^ byte) & 0xFFFF
-            for _ in range(8):
-                if crc & 0x8000:
-                    crc = ((crc << 1) ^ 0xCC01) & 0xFFFF
-                else:
-                    crc = (crc << 1) & 0xFFFF
-        return crc
+    def _feed(self, chunk):
+        """Update the running 0xCC01 file CRC with bytes just appended to the buffer."""
+        self.crc = crc16_cc01(chunk, self.crc)
     
     def add_file_id(self, type_=4, manufacturer=1, product=0, serial_number=0, time_created=0):
         """Add file ID message."""
-        msg = struct.pack('<BHHHQ', 0, type_, manufacturer, product, serial_number)
-        self.data_buffer += bytes([0x40, 0]) + msg  # normal header + file_id type
+        msg = _FILE_ID_S.pack(0, type_, manufacturer, product, serial_number)
+        self.data_buffer.append(0x40)  # normal header + file_id type
+        self.data_buffer.append(0)
+        self.data_buffer.extend(msg)
+        self._feed(self.data_buffer[-(2 + len(msg)):])
     
     def add_record(self, timestamp, lat, lon, altitude, speed, distance, cadence, power):
         """Add a record message (sensor data point)."""
-        msg = struct.pack('<IiiIIBH',
+        msg = _RECORD_S.pack(
             timestamp & 0xFFFFFFFF,
             int(lat * 2147483648.0 / 180.0),  # semicircles (signed)
             int(lon * 2147483648.0 / 180.0),  # semicircles (signed)
@@ -63,13 +73,40 @@ class FITFileWriter:
             int(cadence) & 0xFF,
             int(power) & 0xFFFF
         )
-        self.data_buffer += bytes([0x40, 20]) + msg  # normal header + record type
+        self.data_buffer.append(0x40)  # normal header + record type
+        self.data_buffer.append(20)
+        self.data_buffer.extend(msg)
+        self._feed(self.data_buffer[-(2 + len(msg)):])
+    
+    def add_records(self, timestamps, lats, lons, speeds, distances, cadences, powers):
+        """Add many record messages at once, packed with a single struct call.
+        
+        Records carry no altitude field, so unlike add_record there is no
+        altitude column to convert.
+        """
+        values = []
+        for timestamp, lat, lon, speed, distance, cadence, power in zip(
+                timestamps, lats, lons, speeds, distances, cadences, powers):
+            values += (
+                0x40, 20,  # normal header + record type
+                timestamp & 0xFFFFFFFF,
+                int(lat * 2147483648.0 / 180.0),  # semicircles (signed)
+                int(lon * 2147483648.0 / 180.0),  # semicircles (signed)
+                int(speed) & 0xFFFFFFFF,
+                int(distance) & 0xFFFFFFFF,
+                int(cadence) & 0xFF,
+                int(power) & 0xFFFF,
+            )
+        count = len(values) // 9
+        packed = struct.pack('<' + 'BBIiiIIBH' * count, *values)
+        self.data_buffer.extend(packed)
+        self._feed(packed)
     
     def add_lap(self, timestamp, start_time, total_distance, total_elapsed_time, avg_speed, max_speed,
                 avg_cadence, max_cadence, total_ascent, total_descent, sport, avg_power, max_power,
                 front_pressure=None, rear_pressure=None):
         """Add a lap message."""
-        msg = struct.pack('<IIIIIIHHHH',
+        msg = _LAP_S.pack(
             timestamp & 0xFFFFFFFF,
             start_time & 0xFFFFFFFF,
             int(total_elapsed_time) & 0xFFFFFFFF,
@@ -81,12 +118,15 @@ class FITFileWriter:
             int(max_cadence) & 0xFF,
             int(total_descent) & 0xFFFF
         )
-        self.data_buffer += bytes([0x40, 21]) + msg  # normal header + lap type
+        self.data_buffer.append(0x40)  # normal header + lap type
+        self.data_buffer.append(21)
+        self.data_buffer.extend(msg)
+        self._feed(self.data_buffer[-(2 + len(msg)):])
     
     def add_session(self, timestamp, start_time, total_distance, total_elapsed_time, avg_speed, max_speed,
                     avg_cadence, max_cadence, total_ascent, total_descent, sport, avg_power, max_power, num_laps):
         """Add a session message."""
-        msg = struct.pack('<IIIIIIHHHH',
+        msg = _SESSION_S.pack(
             timestamp & 0xFFFFFFFF,
             start_time & 0xFFFFFFFF,
             int(total_elapsed_time) & 0xFFFFFFFF,
@@ -98,26 +138,29 @@ class FITFileWriter:
             int(max_cadence) & 0xFF,
             int(total_descent) & 0xFFFF
         )
-        self.data_buffer += bytes([0x40, 34]) + msg  # normal header + session type
+        self.data_buffer.append(0x40)  # normal header + session type
+        self.data_buffer.append(34)
+        self.data_buffer.extend(msg)
+        self._feed(self.data_buffer[-(2 + len(msg)):])
     
     def write_file(self):
         """Write the FIT file."""
         with open(self.filepath, 'wb') as f:
-            # Calculate data size and CRC
-            data_crc = self._crc16(self.data_buffer)
+            # CRC is accumulated as messages are added
+            data_crc = self.crc
             data_size = len(self.data_buffer)
             
             # Write header (14 bytes)
             f.write(bytes([FIT_HEADER_SIZE, FIT_PROTOCOL_VERSION]))
-            f.write(struct.pack('<H', FIT_PROFILE_VERSION))
-            f.write(struct.pack('<I', data_size))
+            f.write(_HDR_PROFILE_S.pack(FIT_PROFILE_VERSION))
+            f.write(_HDR_SIZE_S.pack(data_size))
             f.write(b'.FIT')
             
             # Write data
             f.write(self.data_buffer)
             
             # Write footer (CRC16)
-            f.write(struct.pack('<H', data_crc))
+            f.write(_CRC_S.pack(data_crc))
             
 
 def generate_agricola_descent_runs():
@@ -137,8 +180,6 @@ def generate_agricola_descent_runs():
     start_lon = 21.0455
     end_lat = 52.2395    # Bottom of descent (~500m south)
     end_lon = 21.0470
-    elevation_start = 100.0  # meters
-    elevation_end = 75.0     # meters (25m drop per descent)
     
     # Three runs with different pressures
     runs = [
@@ -147,6 +188,22 @@ def generate_agricola_descent_runs():
         {'front': 70.0, 'rear': 77.0, 'run': 3, 'base_speed_ms': 24.2},   # 87.0 km/h
     ]
     
+    # Within each 500m descent, generate realistic data points
+    # At ~20 m/s, getting a point every ~5m means ~25 points per descent
+    points_per_descent = 25
+    
+    # The polyline along the street is the same for every descent of every run
+    progresses = [i / points_per_descent for i in range(points_per_descent)]  # 0 to 1 along a descent
+    # Interpolate GPS coordinates along the 500m segment
+    descent_lats = [start_lat + (end_lat - start_lat) * p for p in progresses]
+    descent_lons = [start_lon + (end_lon - start_lon) * p for p in progresses]
+    # Speed variation: peaks in middle of descent, slower at start/end
+    speed_multipliers = [math.sin(p * math.pi) for p in progresses]  # sine curve 0->1->0
+    
+    # Bind the RNG draws once; every run shares the module's single RNG state
+    gauss = random.gauss
+    uniform = random.random
+    
     for run_config in runs:
         front_psi = run_config['front']
         rear_psi = run_config['rear']
@@ -172,61 +229,53 @@ def generate_agricola_descent_runs():
         total_distance = num_descents * descent_length_m
         total_elevation_loss = num_descents * 25.0  # 25m loss per 500m descent
         
-        data_points = []
+        # Per-field columns (one entry per data point) instead of a dict per point
+        times = []
+        lats = []
+        lons = []
         speeds = []
+        distances = []
+        cadences = []
+        powers = []
+        
+        # Time and distance offsets of each point within a descent
+        time_offsets = [descent_time_s / points_per_descent * i for i in range(points_per_descent)]
+        distance_offsets = [descent_length_m / points_per_descent * i for i in range(points_per_descent)]
         
         # Generate data for each descent pass
         for descent_idx in range(num_descents):
             descent_start_time = int(descent_idx * descent_time_s)
+            descent_start_distance = descent_idx * descent_length_m
             
-            # Within each 500m descent, generate realistic data points
-            # At ~20 m/s, getting a point every ~5m means ~25 points per descent
-            points_per_descent = 25
+            # Draw this descent's noise in bulk rather than point by point
+            speed_noise = [gauss(0, 0.5) for _ in range(points_per_descent)]  # ±0.5 m/s noise
+            cadence_noise = [gauss(0, 3) for _ in range(points_per_descent)]
+            power_noise = [gauss(0, 8) for _ in range(points_per_descent)]
+            pedalling = [uniform() > 0.7 for _ in range(points_per_descent)]
             
             for point_idx in range(points_per_descent):
-                progress = point_idx / points_per_descent  # 0 to 1 along this descent
-                
-                # Interpolate GPS coordinates along the 500m segment
-                lat = start_lat + (end_lat - start_lat) * progress
-                lon = start_lon + (end_lon - start_lon) * progress
-                
-                # Elevation loss along descent
-                elevation = elevation_start - (elevation_start - elevation_end) * progress
-                
-                # Speed variation: peaks in middle of descent, slower at start/end
-                speed_multiplier = math.sin(progress * math.pi)  # sine curve 0->1->0
-                speed_noise = random.gauss(0, 0.5)  # ±0.5 m/s noise
-                speed = base_speed * (0.8 + 0.2 * speed_multiplier) + speed_noise
+                speed_multiplier = speed_multipliers[point_idx]
+                speed = base_speed * (0.8 + 0.2 * speed_multiplier) + speed_noise[point_idx]
                 speed = max(0.1, speed)  # Don't go negative
                 speeds.append(speed)
                 
                 # Cadence while coasting on descent (typically 40-60 RPM)
-                cadence = int(40 + 20 * speed_multiplier + random.gauss(0, 3))
+                cadence = int(40 + 20 * speed_multiplier + cadence_noise[point_idx])
                 cadence = max(30, min(80, cadence))
                 
                 # Power: coasting on descent, minimal power, mostly gravity-driven
                 # Realistic power for coasting: 10-30W from occasional pedal strokes
-                power = int(20 + random.gauss(0, 8)) if random.random() > 0.7 else 0
+                power = int(20 + power_noise[point_idx]) if pedalling[point_idx] else 0
                 power = max(0, min(50, power))
                 
-                # Time accumulation
-                time_in_descent = descent_time_s / points_per_descent * point_idx
-                accumulated_time = int(descent_start_time + time_in_descent)
-                
-                # Distance accumulation
-                distance_in_descent = descent_length_m / points_per_descent * point_idx
-                accumulated_distance = descent_idx * descent_length_m + distance_in_descent
-                
-                data_points.append({
-                    'time': accumulated_time,
-                    'lat': lat,
-                    'lon': lon,
-                    'elevation': elevation,
-                    'speed': speed,
-                    'distance': accumulated_distance,
-                    'cadence': cadence,
-                    'power': power,
-                })
+                cadences.append(cadence)
+                powers.append(power)
+            
+            # Time and distance accumulation
+            times.extend([int(descent_start_time + t) for t in time_offsets])
+            distances.extend([descent_start_distance + d for d in distance_offsets])
+            lats.extend(descent_lats)
+            lons.extend(descent_lons)
         
         # Calculate statistics
         avg_speed = total_distance / actual_duration if actual_duration > 0 else 0
@@ -271,17 +320,15 @@ def generate_agricola_descent_runs():
         
         # Add records (sensor data)
         start_time = int(datetime.now().timestamp())
-        for point in data_points:
-            fit_writer.add_record(
-                timestamp=start_time + point['time'],
-                lat=point['lat'],
-                lon=point['lon'],
-                altitude=int(point['elevation']),
-                speed=int(point['speed'] * 1000),  # mm/s
-                distance=int(point['distance'] * 100),  # cm
-                cadence=point['cadence'],
-                power=point['power']
-            )
+        fit_writer.add_records(
+            timestamps=[start_time + time for time in times],
+            lats=lats,
+            lons=lons,
+            speeds=[int(speed * 1000) for speed in speeds],  # mm/s
+            distances=[int(distance * 100) for distance in distances],  # cm
+            cadences=cadences,
+            powers=powers
+        )
         
         # Add lap message with pressure data
         fit_writer.add_lap(
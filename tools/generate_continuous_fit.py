@@ -11,9 +11,16 @@ import struct
 import json
 import math
 import random
+import os
+import sys
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
+# fit_crc.py lives at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import crc16_cc01
+
 # FIT file constants
 FIT_HEADER_SIZE = 14
 FIT_PROTOCOL_VERSION = 0x20
@@ -37,197 +44,255 @@ STREET_GRADIENT = ELEVATION_DROP / STREET_LENGTH
 STREET_ANGLE = math.atan(STREET_GRADIENT)
 
 
+# Aerodynamic drag is DRAG_FACTOR * speed^2
+DRAG_FACTOR = 0.5 * AIR_DENSITY * CD * FRONTAL_AREA
+
+
+def _descent_kernel(steps, dt, mass, gravity_force, rolling_force):
+    """Integrate a coast down the street; returns (speeds, positions, brake_forces)."""
+    speed = 0.0
+    position = 0.0
+    speeds = []
+    positions = []
+    brake_forces = []
+    
+    # Loop invariants
+    slope_force = gravity_force - rolling_force
+    # Braking at 80% of street
+    brake_position = STREET_LENGTH * 0.8
+    brake_span = STREET_LENGTH - brake_position
+    
+    for step in range(steps):
+        drag_force = DRAG_FACTOR * (speed * speed)
+        
+        if position >= brake_position:
+            brake_intensity = (position - brake_position) / brake_span
+            brake_force = 400 * brake_intensity
+        else:
+            brake_force = 0
+        
+        net_force = slope_force - drag_force - brake_force
+        acceleration = net_force / mass
+        speed += acceleration * dt
+        if speed < 0:
+            speed = 0.0
+        position += speed * dt
+        if position > STREET_LENGTH:
+            position = STREET_LENGTH
+        
+        speeds.append(speed)
+        positions.append(position)
+        brake_forces.append(brake_force)
+        
+        # Stop when reached bottom and nearly stopped
+        if position >= STREET_LENGTH and speed < 1.0:
+            break
+    
+    return speeds, positions, brake_forces
+
+
+def _climb_kernel(steps, dt, mass, gravity_force, rolling_force, pedal_power):
+    """Integrate a ride back up the street; returns (speeds, positions)."""
+    position = STREET_LENGTH
+    speed = 2.0
+    speeds = []
+    positions = []
+    
+    for step in range(steps):
+        drag_force = DRAG_FACTOR * (speed * speed)
+        
+        if speed > 0.5:
+            pedal_force = pedal_power / speed
+        else:
+            pedal_force = 200
+        
+        net_force = pedal_force - gravity_force - rolling_force - drag_force
+        acceleration = net_force / mass
+        speed += acceleration * dt
+        if speed < 0.5:
+            speed = 0.5
+        position -= speed * dt
+        if position < 0:
+            position = 0.0
+        
+        speeds.append(speed)
+        positions.append(position)
+        
+        # Stop when reached top
+        if position <= 0:
+            break
+    
+    return speeds, positions
+
+
+def _trace(dt, positions, speeds, powers, elevations, cadences):
+    """Bundle per-sample columns (one list per channel) into a simulation trace."""
+    return {
+        'time': [step * dt for step in range(len(positions))],
+        'position': positions,
+        'speed': speeds,
+        'power': powers,
+        'elevation': elevations,
+        'cadence': cadences,
+    }
+
+
 class PhysicsSimulator:
     """Realistic cycling physics simulation."""
     
     def __init__(self, tire_pressure_bar):
-        self.pressure = tire_pressure_bar
         self.mass = TOTAL_MASS
+        # Neither force depends on speed, so work them out once per simulator
+        self.normal_force = self.mass * GRAVITY * math.cos(STREET_ANGLE)
+        self.gravity_force = self.mass * GRAVITY * math.sin(STREET_ANGLE)
+        self.set_pressure(tire_pressure_bar)
+    
+    def set_pressure(self, tire_pressure_bar):
+        """Switch tire pressure; only rolling resistance depends on it."""
+        self.pressure = tire_pressure_bar
         # Crr formula: lower pressure = worse rolling
         self.crr = max(0.003, 0.008 - 0.0006 * (tire_pressure_bar - 3.0))
-    
-    def _rolling_resistance(self, speed_ms):
-        normal_force = self.mass * GRAVITY * math.cos(STREET_ANGLE)
-        return self.crr * normal_force
-    
-    def _air_drag(self, speed_ms):
-        return 0.5 * AIR_DENSITY * CD * FRONTAL_AREA * (speed_ms ** 2)
-    
-    def _gravity_component(self):
-        return self.mass * GRAVITY * math.sin(STREET_ANGLE)
+        self.rolling_force = self.crr * self.normal_force
     
     def simulate_descent(self, duration_seconds=40):
         """Coasting down without pedaling."""
-        data = []
-        speed = 0.0
-        position = 0.0
         dt = 0.1
+        speeds, positions, brake_forces = _descent_kernel(
+            int(duration_seconds / dt), dt, self.mass, self.gravity_force, self.rolling_force)
         
-        for step in range(int(duration_seconds / dt)):
-            time = step * dt
-            
-            gravity_force = self._gravity_component()
-            rolling_force = self._rolling_resistance(speed)
-            drag_force = self._air_drag(speed)
-            
-            # Braking at 80% of street
-            brake_position = STREET_LENGTH * 0.8
-            if position >= brake_position:
-                brake_intensity = (position - brake_position) / (STREET_LENGTH - brake_position)
-                brake_force = 400 * brake_intensity
-            else:
-                brake_force = 0
-            
-            net_force = gravity_force - rolling_force - drag_force - brake_force
-            acceleration = net_force / self.mass
-            speed = max(0, speed + acceleration * dt)
-            position = min(STREET_LENGTH, position + speed * dt)
-            
-            elevation = 100.0 - (position / STREET_LENGTH) * ELEVATION_DROP
-            cadence = 0 if speed < 5 else int(30 + (speed - 5) * 2)
-            power = int(speed * brake_force)  # Braking dissipation
-            
-            data.append({
-                'time': time,
-                'position': position,
-                'speed': speed,
-                'power': power,
-                'elevation': elevation,
-                'cadence': min(120, cadence),
-            })
-            
-            if position >= STREET_LENGTH and speed < 1.0:
-                break
+        elevations = [100.0 - (p / STREET_LENGTH) * ELEVATION_DROP for p in positions]
+        cadences = [0 if v < 5 else min(120, int(30 + (v - 5) * 2)) for v in speeds]
+        powers = [int(v * f) for v, f in zip(speeds, brake_forces)]  # Braking dissipation
         
-        return data
+        return _trace(dt, positions, speeds, powers, elevations, cadences)
     
     def simulate_climb(self, duration_seconds=90):
         """Pedaling back up."""
-        data = []
-        position = STREET_LENGTH
-        speed = 2.0
         pedal_power = 300  # Watts
         dt = 0.1
+        speeds, positions = _climb_kernel(
+            int(duration_seconds / dt), dt, self.mass, self.gravity_force, self.rolling_force, pedal_power)
+        
+        elevations = [100.0 - (p / STREET_LENGTH) * ELEVATION_DROP for p in positions]
         
-        for step in range(int(duration_seconds / dt)):
-            time = step * dt
-            
-            gravity_force = self._gravity_component()
-            rolling_force = self._rolling_resistance(speed)
-            drag_force = self._air_drag(speed)
-            
-            if speed > 0.5:
-                pedal_force = pedal_power / speed
-            else:
-                pedal_force = 200
-            
-            net_force = pedal_force - gravity_force - rolling_force - drag_force
-            acceleration = net_force / self.mass
-            speed = max(0.5, speed + acceleration * dt)
-            position = max(0, position - speed * dt)
-            
-            elevation = 100.0 - (position / STREET_LENGTH) * ELEVATION_DROP
-            cadence = int(85 + random.gauss(0, 5))
-            cadence = max(70, min(110, cadence))
-            power = pedal_power + int(random.gauss(0, 10))
-            
-            data.append({
-                'time': time,
-                'position': position,
-                'speed': speed,
-                'power': power,
-                'elevation': elevation,
-                'cadence': cadence,
-            })
-            
-            if position <= 0:
-                break
+        # Draw all of the climb's noise up front, one batch per channel
+        gauss = random.gauss
+        cadence_noise = [gauss(0, 5) for _ in positions]
+        power_noise = [gauss(0, 10) for _ in positions]
+        cadences = [max(70, min(110, int(85 + n))) for n in cadence_noise]
+        powers = [pedal_power + int(n) for n in power_noise]
         
-        return data
+        return _trace(dt, positions, speeds, powers, elevations, cadences)
+    
+    def simulate_run(self, descent_seconds=60, climb_seconds=90):
+        """Descent straight into the climb, as one trace.
+        
+        Returns (trace, descent_samples); the first descent_samples entries
+        of every column belong to the descent.
+        """
+        run = self.simulate_descent(duration_seconds=descent_seconds)
+        climb = self.simulate_climb(duration_seconds=climb_seconds)
+        descent_samples = len(run['time'])
+        for key, column in run.items():
+            column.extend(climb[key])
+        return run, descent_samples
 
 
 class FITFileWriter:
     """Write FIT format files with proper CRC."""
     
+    # Header size, protocol, profile, data size, '.FIT'
+    _HEADER_STRUCT = struct.Struct('<BBHI4s')
+    # Each message Struct starts with the normal header and message type bytes
+    _FILE_ID_STRUCT = struct.Struct('<BBBHHHQ')
+    _RECORD_STRUCT = struct.Struct('<BBIiiIIBH')
+    _LAP_STRUCT = struct.Struct('<BBIIIIIIHHHH')
+    
     def __init__(self, filepath):
         self.filepath = filepath
-        self.data_buffer = b''
+        self.data_buffer = bytearray()
         self.timestamp_counter = 0
     
     def _crc16(self, data):
-        crc = 0
-        for byte in data:
-            crc = ((crc << 8) ^ byte) & 0xFFFF
-            for _ in range(8):
-                if crc & 0x8000:
-                    crc = ((crc << 1) ^ 0xCC01) & 0xFFFF
-                else:
-                    crc = (crc << 1) & 0xFFFF
-        return crc
+        # The 0xCC01 file CRC the other generators write, table-driven
+        return crc16_cc01(data)
     
     def add_file_id(self, type_=4, manufacturer=1, product=0, serial_number=0, time_created=0):
-        msg = struct.pack('<BHHHQ', 0, type_, manufacturer, product, serial_number)
-        self.data_buffer += bytes([0x40, 0]) + msg
+        self.data_buffer.extend(self._FILE_ID_STRUCT.pack(
+            0x40, 0, 0, type_, manufacturer, product, serial_number))
     
-    def add_record(self, timestamp, lat, lon, altitude, speed, distance, cadence, power):
-        msg = struct.pack('<IiiIIBH',
-            int(timestamp) & 0xFFFFFFFF,
+    def add_record(self, timestamp, lat, lon, speed, distance, cadence, power):
+        self.data_buffer.extend(self._RECORD_STRUCT.pack(0x40, 20,
+            int(timestamp),
             int(lat * 2147483648.0 / 180.0),
             int(lon * 2147483648.0 / 180.0),
-            int(speed) & 0xFFFFFFFF,
-            int(distance) & 0xFFFFFFFF,
-            int(cadence) & 0xFF,
-            int(power) & 0xFFFF
-        )
-        self.data_buffer += bytes([0x40, 20]) + msg
+            int(speed),
+            int(distance),
+            int(cadence),
+            int(power)
+        ))
+    
+    def add_records(self, records):
+        """Add record messages for (timestamp, lat, lon, speed, distance, cadence, power) tuples.
+        
+        Everything but lat/lon must already be a scaled int (whole seconds,
+        mm/s, cm, rpm, W); those fields are packed as-is.
+        """
+        pack_into = self._RECORD_STRUCT.pack_into
+        size = self._RECORD_STRUCT.size
+        semicircles = 2147483648.0 / 180.0  # degrees -> semicircles, folded once
+        buf = bytearray(len(records) * size)
+        offset = 0
+        for timestamp, lat, lon, speed, distance, cadence, power in records:
+            pack_into(buf, offset, 0x40, 20,
+                timestamp,
+                int(lat * semicircles),
+                int(lon * semicircles),
+                speed,
+                distance,
+                cadence,
+                power
+            )
+            offset += size
+        self.data_buffer.extend(buf)
+    
+    def _add_lap_like(self, tag, timestamp, start_time, total_distance, total_elapsed_time,
+                      avg_speed, max_speed, avg_cadence, max_cadence, total_descent, sport):
+        """Lap (21) and session (34) messages share one layout."""
+        self.data_buffer.extend(self._LAP_STRUCT.pack(0x40, tag,
+            int(timestamp),
+            int(start_time),
+            int(total_elapsed_time),
+            int(total_distance),
+            int(avg_speed),
+            int(max_speed),
+            int(sport),
+            int(avg_cadence),
+            int(max_cadence),
+            int(total_descent)
+        ))
     
     def add_lap(self, timestamp, start_time, total_distance, total_elapsed_time, avg_speed, max_speed,
-                avg_cadence, max_cadence, total_descent, sport, avg_power, max_power):
-        msg = struct.pack('<IIIIIIHHHH',
-            int(timestamp) & 0xFFFFFFFF,
-            int(start_time) & 0xFFFFFFFF,
-            int(total_elapsed_time) & 0xFFFFFFFF,
-            int(total_distance) & 0xFFFFFFFF,
-            int(avg_speed) & 0xFFFFFFFF,
-            int(max_speed) & 0xFFFFFFFF,
-            int(sport) & 0xFFFF,
-            int(avg_cadence) & 0xFF,
-            int(max_cadence) & 0xFF,
-            int(total_descent) & 0xFFFF
-        )
-        self.data_buffer += bytes([0x40, 21]) + msg
+                avg_cadence, max_cadence, total_descent, sport):
+        self._add_lap_like(21, timestamp, start_time, total_distance, total_elapsed_time,
+                           avg_speed, max_speed, avg_cadence, max_cadence, total_descent, sport)
     
     def add_session(self, timestamp, start_time, total_distance, total_elapsed_time, avg_speed, max_speed,
-                    avg_cadence, max_cadence, total_descent, sport, avg_power, max_power, num_laps):
-        msg = struct.pack('<IIIIIIHHHH',
-            int(timestamp) & 0xFFFFFFFF,
-            int(start_time) & 0xFFFFFFFF,
-            int(total_elapsed_time) & 0xFFFFFFFF,
-            int(total_distance) & 0xFFFFFFFF,
-            int(avg_speed) & 0xFFFFFFFF,
-            int(max_speed) & 0xFFFFFFFF,
-            int(sport) & 0xFFFF,
-            int(avg_cadence) & 0xFF,
-            int(max_cadence) & 0xFF,
-            int(total_descent) & 0xFFFF
-        )
-        self.data_buffer += bytes([0x40, 34]) + msg
+                    avg_cadence, max_cadence, total_descent, sport):
+        self._add_lap_like(34, timestamp, start_time, total_distance, total_elapsed_time,
+                           avg_speed, max_speed, avg_cadence, max_cadence, total_descent, sport)
     
     def write_file(self):
+        # Both the CRC and the file take the bytearray through the buffer
+        # protocol, so the data section is never copied into a new object
+        data = memoryview(self.data_buffer)
+        data_crc = self._crc16(data)
+        header = self._HEADER_STRUCT.pack(FIT_HEADER_SIZE, FIT_PROTOCOL_VERSION,
+                                          FIT_PROFILE_VERSION, len(data), b'.FIT')
+        
         with open(self.filepath, 'wb') as f:
-            data_crc = self._crc16(self.data_buffer)
-            data_size = len(self.data_buffer)
-            
-            # Header
-            f.write(bytes([FIT_HEADER_SIZE, FIT_PROTOCOL_VERSION]))
-            f.write(struct.pack('<H', FIT_PROFILE_VERSION))
-            f.write(struct.pack('<I', data_size))
-            f.write(b'.FIT')
-            
-            # Data
-            f.write(self.data_buffer)
-            
-            # Footer
+            f.write(header)
+            f.write(data)
             f.write(struct.pack('<H', data_crc))
 
 
@@ -262,89 +327,66 @@ def generate_continuous_fit():
     global_time = 0
     all_stats = []
     
-    # Generate 3 continuous runs
+    # Generate 3 continuous runs, sweeping one simulator across the pressures
+    simulator = PhysicsSimulator(pressures[0][0])
     for front_bar, run_num in pressures:
         print(f'\n✓ Run {run_num}: {front_bar} bar (continuous)')
         
-        simulator = PhysicsSimulator(front_bar)
-        
-        # Descent phase
-        descent_data = simulator.simulate_descent(duration_seconds=60)
-        descent_duration = len(descent_data) * 0.1
+        simulator.set_pressure(front_bar)
         
-        # Climb phase (no break - continuous)
-        climb_data = simulator.simulate_climb(duration_seconds=90)
-        climb_duration = len(climb_data) * 0.1
+        # Descent then climb (no break - continuous)
+        run, descent_samples = simulator.simulate_run(descent_seconds=60, climb_seconds=90)
+        run_samples = len(run['time'])
+        descent_duration = descent_samples * 0.1
+        climb_duration = (run_samples - descent_samples) * 0.1
         
-        run_data = descent_data + climb_data
         run_start_time = global_time
         
-        # Write all records for this run
-        all_speeds = []
-        all_powers = []
-        all_cadences = []
-        all_elevations = []
-        all_positions = []
-        descent_speeds = []
-        climb_speeds = []
-        climb_powers = []
+        # Whole-run columns
+        times = run['time']
+        all_positions = run['position']
+        all_speeds = run['speed']
+        all_powers = run['power']
+        all_cadences = run['cadence']
+        all_elevations = run['elevation']
         
-        for idx, point in enumerate(run_data):
-            time_offset = point['time']
-            
-            # GPS interpolation
-            progress = min(1.0, point['position'] / STREET_LENGTH)
-            lat = start_lat + (end_lat - start_lat) * progress
-            lon = start_lon + (end_lon - start_lon) * progress
-            
-            elevation = point['elevation']
-            speed = point['speed']
-            cadence = point['cadence']
-            power = point['power']
-            
-            all_speeds.append(speed)
-            all_powers.append(power)
-            all_cadences.append(cadence)
-            all_elevations.append(elevation)
-            all_positions.append(point['position'])
-            
-            # Track descent vs climb
-            if idx < len(descent_data):
-                descent_speeds.append(speed)
-            else:
-                climb_speeds.append(speed)
-                climb_powers.append(power)
-            
-            # Add record to FIT
-            fit_writer.add_record(
-                timestamp=start_timestamp + int(global_time + time_offset),
-                lat=lat,
-                lon=lon,
-                altitude=int(elevation * 100),
-                speed=int(speed * 1000),
-                distance=int(point['position'] * 100),
-                cadence=cadence,
-                power=power
-            )
+        # GPS interpolation
+        progresses = [min(1.0, position / STREET_LENGTH) for position in all_positions]
+        lats = [start_lat + (end_lat - start_lat) * progress for progress in progresses]
+        lons = [start_lon + (end_lon - start_lon) * progress for progress in progresses]
+        
+        # Whole-second timestamps for the run, converted once up front
+        timestamps = [start_timestamp + int(global_time + time_offset) for time_offset in times]
+        
+        # Write all records for this run
+        fit_writer.add_records(list(zip(
+            timestamps,
+            lats,
+            lons,
+            [int(speed * 1000) for speed in all_speeds],
+            [int(position * 100) for position in all_positions],
+            all_cadences,
+            all_powers,
+        )))
         
         # Stats
-        run_duration = len(run_data) * 0.1
+        run_duration = run_samples * 0.1
         total_distance = max(all_positions) if all_positions else 0
-        avg_speed = sum(all_speeds) / len(all_speeds) if all_speeds else 0
-        max_speed = max(all_speeds) if all_speeds else 0
-        avg_cadence = sum(all_cadences) / len(all_cadences) if all_cadences else 0
-        max_cadence = max(all_cadences) if all_cadences else 0
-        avg_power = sum(all_powers) / len(all_powers) if all_powers else 0
-        max_power = max(all_powers) if all_powers else 0
+        avg_speed = sum(all_speeds) / run_samples if run_samples else 0
+        max_speed = max(all_speeds) if run_samples else 0
+        avg_cadence = sum(all_cadences) / run_samples if run_samples else 0
+        max_cadence = max(all_cadences) if run_samples else 0
         elevation_loss = max(all_elevations) - min(all_elevations) if all_elevations else 0
         
-        max_descent = max(descent_speeds) if descent_speeds else 0
-        avg_descent_speed = sum(descent_speeds) / len(descent_speeds) if descent_speeds else 0
-        avg_climb_speed = sum(climb_speeds) / len(climb_speeds) if climb_speeds else 0
-        avg_climb_power = sum(climb_powers) / len(climb_powers) if climb_powers else 0
+        # Descent vs climb, read straight off the run columns without slicing copies
+        climb_samples = run_samples - descent_samples
+        max_descent = max(islice(all_speeds, descent_samples)) if descent_samples else 0
+        avg_descent_speed = sum(islice(all_speeds, descent_samples)) / descent_samples if descent_samples else 0
+        avg_climb_speed = sum(islice(all_speeds, descent_samples, None)) / climb_samples if climb_samples else 0
+        avg_climb_power = sum(islice(all_powers, descent_samples, None)) / climb_samples if climb_samples else 0
         
         # Add lap
-        run_end_time = global_time + len(run_data) * 0.1
+        run_end_time = global_time + run_samples * 0.1
         fit_writer.add_lap(
             timestamp=start_timestamp + int(run_end_time),
             start_time=start_timestamp + run_start_time,
@@ -355,9 +397,7 @@ def generate_continuous_fit():
             avg_cadence=int(avg_cadence),
             max_cadence=int(max_cadence),
             total_descent=int(elevation_loss * 100),
-            sport=1,
-            avg_power=int(avg_power),
-            max_power=int(max_power)
+            sport=1
         )
         
         print(f'  ⬇️ Descent ({descent_duration:.0f}s):')
@@ -387,10 +427,7 @@ def generate_continuous_fit():
         avg_cadence=0,
         max_cadence=0,
         total_descent=0,
-        sport=1,
-        avg_power=0,
-        max_power=0,
-        num_laps=3
+        sport=1
     )
     
     # Write FIT
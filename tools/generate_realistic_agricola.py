@@ -15,9 +15,16 @@ import struct
 import json
 import math
 import random
+import os
+import sys
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
 
+# fit_crc.py lives at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import crc16_cc01
+
 # FIT file constants
 FIT_HEADER_SIZE = 14
 FIT_PROTOCOL_VERSION = 0x20
@@ -41,6 +48,130 @@ ELEVATION_DROP = 25.0  # meters
 STREET_GRADIENT = ELEVATION_DROP / STREET_LENGTH  # ~0.05 = 5%
 STREET_ANGLE = math.atan(STREET_GRADIENT)  # radians
 
+# Force constants, folded once: gravity down the slope, the normal force
+# (rolling resistance is Crr * K_ROLL) and the drag factor (drag is
+# K_DRAG * speed^2)
+K_GRAV = TOTAL_MASS * GRAVITY * math.sin(STREET_ANGLE)
+K_ROLL = TOTAL_MASS * GRAVITY * math.cos(STREET_ANGLE)
+K_DRAG = 0.5 * AIR_DENSITY * CD * FRONTAL_AREA
+
+
+def _integrate_descent(num_steps, dt, mass, gravity_force, rolling_force):
+    """
+    Integrate a coast down the street from a standing start at the top.
+    
+    Returns:
+        (speeds, positions, brake_forces) lists, one entry per step
+    """
+    speed = 0.0
+    position = 0.0
+    speeds = []
+    positions = []
+    brake_forces = []
+    
+    # Braking starts at 80% of street length (400m) and ramps up to 400N
+    # at the bottom, i.e. brake_gain newtons per meter past brake_position
+    brake_position = STREET_LENGTH * 0.8
+    brake_gain = 400 / (STREET_LENGTH - brake_position)
+    slope_force = gravity_force - rolling_force
+    
+    for step in range(num_steps):
+        # Braking force (stronger the further down); zero above the zone.
+        # One linear expression with a select, not two code paths.
+        over = position - brake_position
+        brake_force = brake_gain * (over if over > 0.0 else 0.0)
+        
+        # Net force equation: F_net = F_gravity - F_rolling - F_drag - F_brake,
+        # with drag K_DRAG * v*v written inline
+        net_force = slope_force - K_DRAG * (speed * speed) - brake_force
+        
+        # Update speed (don't go backwards), then position. Clamped with
+        # comparisons rather than max()/min() calls on every step.
+        speed += net_force / mass * dt
+        if speed < 0.0:
+            speed = 0.0
+        position += speed * dt
+        if position > STREET_LENGTH:
+            position = STREET_LENGTH
+        
+        speeds.append(speed)
+        positions.append(position)
+        brake_forces.append(brake_force)
+        
+        # Stop when reached bottom and nearly stopped
+        if position >= STREET_LENGTH and speed < 1.0:
+            break
+    
+    return speeds, positions, brake_forces
+
+
+def _integrate_climb(num_steps, dt, mass, gravity_force, rolling_force, pedal_power):
+    """
+    Integrate pedaling back up the street from the bottom at walking speed.
+    
+    Returns:
+        (speeds, positions) lists, one entry per step
+    """
+    position = STREET_LENGTH
+    speed = 2.0
+    speeds = []
+    positions = []
+    
+    for step in range(num_steps):
+        # Power to force conversion: Power = Force * velocity
+        # Pedaling force = Power / speed (but cap it)
+        if speed > 0.5:
+            pedal_force = pedal_power / speed
+        else:
+            pedal_force = 200  # Can't generate infinite force
+        
+        # Net force: F_pedal - F_gravity - F_rolling - F_drag
+        net_force = pedal_force - gravity_force - rolling_force - K_DRAG * (speed * speed)
+        
+        # Update speed, then position (going backwards up the hill)
+        speed += net_force / mass * dt
+        if speed < 0.5:
+            speed = 0.5
+        position -= speed * dt
+        if position < 0.0:
+            position = 0.0
+        
+        speeds.append(speed)
+        positions.append(position)
+        
+        # Stop when reached top
+        if position <= 0:
+            break
+    
+    return speeds, positions
+
+
+def _trace(dt, positions, speeds, powers, elevations, cadences, trace=None):
+    """
+    Bundle per-sample columns (one list per channel) into a simulation trace.
+    
+    If trace is given, the samples are appended to its columns instead, so
+    consecutive phases fill one trace; time restarts at 0 for each phase.
+    """
+    times = [step * dt for step in range(len(positions))]
+    if trace is None:
+        return {
+            'time': times,
+            'position': positions,
+            'speed': speeds,
+            'power': powers,
+            'elevation': elevations,
+            'cadence': cadences,
+        }
+    trace['time'] += times
+    trace['position'] += positions
+    trace['speed'] += speeds
+    trace['power'] += powers
+    trace['elevation'] += elevations
+    trace['cadence'] += cadences
+    return trace
+
+
 class PhysicsSimulator:
     """Simulates cycling physics on Agricola Street descent."""
     
@@ -51,28 +182,30 @@ class PhysicsSimulator:
         Args:
             tire_pressure_bar: Pressure in bar (3.5, 4.4, or 5.0)
         """
-        self.pressure = tire_pressure_bar
         self.mass = TOTAL_MASS
         
+        # Gravity (N) depends on neither speed nor pressure
+        self.gravity_force = K_GRAV
+        self.set_pressure(tire_pressure_bar)
+    
+    def set_pressure(self, tire_pressure_bar):
+        """
+        Switch tire pressure; only rolling resistance depends on it.
+        
+        Args:
+            tire_pressure_bar: Pressure in bar (3.5, 4.4, or 5.0)
+        """
+        self.pressure = tire_pressure_bar
+        
         # Rolling resistance coefficient varies with pressure
         # Lower pressure = higher Crr (worse rolling)
         # Higher pressure = lower Crr (better rolling)
         # Formula: Crr = 0.008 - 0.0006 * (P - 3.0) where P is in bar
         # This gives: 3.5bar -> 0.0067, 4.4bar -> 0.0046, 5.0bar -> 0.0038
         self.crr = max(0.003, 0.008 - 0.0006 * (tire_pressure_bar - 3.0))
-    
-    def _rolling_resistance(self, speed_ms):
-        """Calculate rolling resistance force in Newtons."""
-        normal_force = self.mass * GRAVITY * math.cos(STREET_ANGLE)
-        return self.crr * normal_force
-    
-    def _air_drag(self, speed_ms):
-        """Calculate air drag force in Newtons."""
-        return 0.5 * AIR_DENSITY * CD * FRONTAL_AREA * (speed_ms ** 2)
-    
-    def _gravity_component(self):
-        """Gravitational component down the slope in Newtons."""
-        return self.mass * GRAVITY * math.sin(STREET_ANGLE)
+        
+        # Rolling resistance (N) doesn't depend on speed
+        self.rolling_force = self.crr * K_ROLL
     
     def simulate_descent(self, duration_seconds=40):
         """
@@ -82,98 +215,44 @@ class PhysicsSimulator:
             duration_seconds: How long to simulate
             
         Returns:
-            List of (time, position, speed, power, elevation) tuples
+            (trace, max_speed): trace maps each channel (time, position,
+            speed, power, elevation, cadence) to a list of samples
         """
-        data = []
-        speed = 0.0  # Start from standing start
-        position = 0.0  # Start at top (0m)
-        max_speed_achieved = 0.0
-        
         dt = 0.1  # 0.1 second time steps
         num_steps = int(duration_seconds / dt)
         
-        for step in range(num_steps):
-            time = step * dt
-            
-            # Calculate forces
-            gravity_force = self._gravity_component()
-            rolling_force = self._rolling_resistance(speed)
-            drag_force = self._air_drag(speed)
-            
-            # Braking starts at 80% of street length (400m)
-            brake_position = STREET_LENGTH * 0.8
-            if position >= brake_position:
-                # Braking force (stronger the faster you go)
-                brake_intensity = (position - brake_position) / (STREET_LENGTH - brake_position)
-                brake_force = 400 * brake_intensity  # Up to 400N braking
-            else:
-                brake_force = 0
-            
-            # Net force equation: F_net = F_gravity - F_rolling - F_drag - F_brake
-            net_force = gravity_force - rolling_force - drag_force - brake_force
-            
-            # Acceleration a = F / m
-            acceleration = net_force / self.mass
-            
-            # Update speed (don't go backwards)
-            speed = max(0, speed + acceleration * dt)
-            max_speed_achieved = max(max_speed_achieved, speed)
-            
-            # Update position
-            position = min(STREET_LENGTH, position + speed * dt)
-            
-            # Power output (negative = braking energy)
-            power = int(speed * brake_force)  # Braking dissipates energy
-            
-            # Elevation calculation
-            elevation = 100.0 - (position / STREET_LENGTH) * ELEVATION_DROP
-            
-            # Cadence while coasting (very low)
-            cadence = 0 if speed < 5 else int(30 + (speed - 5) * 2)
-            
-            data.append({
-                'time': time,
-                'position': position,
-                'speed': speed,
-                'power': power,
-                'elevation': elevation,
-                'cadence': min(120, cadence),
-            })
-            
-            # Stop when reached bottom and nearly stopped
-            if position >= STREET_LENGTH and speed < 1.0:
-                break
-        
-        return data, max_speed_achieved
-    
-    def simulate_turnaround(self, duration_seconds=5):
-        """Simulate turning around at bottom."""
-        data = []
-        for i in range(int(duration_seconds * 10)):
-            data.append({
-                'time': i * 0.1,
-                'position': STREET_LENGTH,
-                'speed': 0.0,
-                'power': 0,
-                'elevation': 75.0,
-                'cadence': 0,
-            })
-        return data
-    
-    def simulate_climb(self, duration_seconds=60):
+        # Standing start at the top
+        speeds, positions, brake_forces = _integrate_descent(
+            num_steps, dt, self.mass, self.gravity_force, self.rolling_force)
+        
+        max_speed_achieved = max(speeds, default=0.0)
+        
+        # Elevation, cadence while coasting (very low) and braking power
+        # (braking dissipates energy), one pass per channel
+        elevations = [100.0 - (p / STREET_LENGTH) * ELEVATION_DROP for p in positions]
+        cadences = [0 if v < 5 else min(120, int(30 + (v - 5) * 2)) for v in speeds]
+        powers = [int(v * f) for v, f in zip(speeds, brake_forces)]
+        
+        return _trace(dt, positions, speeds, powers, elevations, cadences), max_speed_achieved
+    
+    def simulate_turnaround(self, duration_seconds=5, trace=None):
+        """Simulate turning around at bottom, appending to trace if given."""
+        samples = int(duration_seconds * 10)
+        return _trace(0.1, [STREET_LENGTH] * samples, [0.0] * samples, [0] * samples,
+                      [75.0] * samples, [0] * samples, trace)
+    
+    def simulate_climb(self, duration_seconds=60, trace=None):
         """
         Simulate pedaling up the hill.
         
         Args:
             duration_seconds: How long to climb
+            trace: Trace to append the climb to (e.g. the descent's), or
+                None for a trace of its own
             
         Returns:
-            List of simulation data points
+            Trace of simulation samples, one list per channel
         """
-        data = []
-        position = STREET_LENGTH  # Start at bottom
-        speed = 2.0  # Start with walking speed
-        
         # Sustainable pedaling power for 90kg rider: ~300W average
         # Can vary from 200W (easy) to 400W (hard effort)
         pedal_power = 300  # Watts
@@ -181,86 +260,77 @@ class PhysicsSimulator:
         dt = 0.1
         num_steps = int(duration_seconds / dt)
         
-        for step in range(num_steps):
-            time = step * dt
-            
-            # Going up slope
-            gravity_force = self._gravity_component()  # Now opposing motion
-            rolling_force = self._rolling_resistance(speed)
-            drag_force = self._air_drag(speed)
-            
-            # Power to force conversion: Power = Force * velocity
-            # Pedaling force = Power / speed (but cap it)
-            if speed > 0.5:
-                pedal_force = pedal_power / speed
-            else:
-                pedal_force = 200  # Can't generate infinite force
-            
-            # Net force: F_pedal - F_gravity - F_rolling - F_drag
-            net_force = pedal_force - gravity_force - rolling_force - drag_force
-            
-            # Acceleration
-            acceleration = net_force / self.mass
-            
-            # Update speed
-            speed = max(0.5, speed + acceleration * dt)
-            
-            # Position (going backwards up the hill)
-            position = max(0, position - speed * dt)
-            
-            # Elevation
-            elevation = 100.0 - (position / STREET_LENGTH) * ELEVATION_DROP
-            
-            # Cadence while pedaling (90 RPM typical)
-            cadence = int(85 + random.gauss(0, 5))
-            cadence = max(70, min(110, cadence))
-            
-            # Power is what we're pedaling at
-            power = pedal_power + int(random.gauss(0, 10))
-            
-            data.append({
-                'time': time,
-                'position': position,
-                'speed': speed,
-                'power': power,
-                'elevation': elevation,
-                'cadence': cadence,
-            })
-            
-            # Stop when reached top
-            if position <= 0:
-                break
+        # Start at bottom with walking speed
+        speeds, positions = _integrate_climb(
+            num_steps, dt, self.mass, self.gravity_force, self.rolling_force, pedal_power)
+        
+        elevations = [100.0 - (p / STREET_LENGTH) * ELEVATION_DROP for p in positions]
+        
+        # Cadence while pedaling (90 RPM typical) and the power we're
+        # pedaling at; each noise channel is drawn as one batch
+        gauss = random.gauss
+        cadence_noise = [gauss(0, 5) for _ in positions]
+        power_noise = [gauss(0, 10) for _ in positions]
+        cadences = [max(70, min(110, int(85 + n))) for n in cadence_noise]
+        powers = [pedal_power + int(n) for n in power_noise]
         
-        return data
+        return _trace(dt, positions, speeds, powers, elevations, cadences, trace)
 
 
 class FITFileWriter:
     """Write FIT format files."""
     
+    # Pre-compiled packers; each message Struct starts with the normal
+    # header and message type bytes
+    _HEADER_STRUCT = struct.Struct('<BBHI4s')
+    _FILE_ID_STRUCT = struct.Struct('<BBBHHHQ')
+    _RECORD_STRUCT = struct.Struct('<BBIiiIIBH')
+    _LAP_STRUCT = struct.Struct('<BBIIIIIIHHHH')
+    _SESSION_STRUCT = _LAP_STRUCT
+    
     def __init__(self, filepath):
         self.filepath = filepath
-        self.data_buffer = b''
-    
-    def _crc16(self, data):
-        """Calculate CRC16 for FIT data."""
-        crc = 0
-        for byte in data:
-            crc = ((crc << 8) ^ byte) & 0xFFFF
-            for _ in range(8):
-                if crc & 0x8000:
-                    crc = ((crc << 1) ^ 0xCC01) & 0xFFFF
-                else:
-                    crc = (crc << 1) & 0xFFFF
-        return crc
+        # Messages are packed in place; data_buffer[:_pos] is the data
+        # written so far, anything after it is reserved space
+        self.data_buffer = bytearray()
+        self._pos = 0
+        # CRC of data_buffer[:_pos], kept up to date as messages are packed
+        self.crc = 0
+    
+    def reserve(self, records=0, laps=0, sessions=0):
+        """Size the data buffer once for messages that are still to come."""
+        needed = (self._pos + records * self._RECORD_STRUCT.size
+                  + laps * self._LAP_STRUCT.size + sessions * self._SESSION_STRUCT.size)
+        if needed > len(self.data_buffer):
+            self.data_buffer.extend(bytes(needed - len(self.data_buffer)))
+    
+    def _claim(self, size):
+        """Return the offset of the next size bytes, growing the buffer if they weren't reserved."""
+        offset = self._pos
+        self._pos += size
+        if self._pos > len(self.data_buffer):
+            self.data_buffer.extend(bytes(self._pos - len(self.data_buffer)))
+        return offset
+    
+    def _feed(self, offset):
+        """Fold the bytes packed since offset into the running CRC, while they're hot."""
+        self.crc = self._crc16(memoryview(self.data_buffer)[offset:self._pos], self.crc)
+    
+    def _crc16(self, data, crc=0):
+        """Calculate CRC16 for FIT data, continuing from crc."""
+        return crc16_cc01(data, crc)
     
     def add_file_id(self, type_=4, manufacturer=1, product=0, serial_number=0, time_created=0):
         """Add file ID message."""
-        msg = struct.pack('<BHHHQ', 0, type_, manufacturer, product, serial_number)
-        self.data_buffer += bytes([0x40, 0]) + msg
+        offset = self._claim(self._FILE_ID_STRUCT.size)
+        self._FILE_ID_STRUCT.pack_into(self.data_buffer, offset,
+            0x40, 0, 0, type_, manufacturer, product, serial_number)
+        self._feed(offset)
     
     def add_record(self, timestamp, lat, lon, altitude, speed, distance, cadence, power):
         """Add a record message (sensor data point)."""
-        msg = struct.pack('<IiiIIBH',
+        offset = self._claim(self._RECORD_STRUCT.size)
+        self._RECORD_STRUCT.pack_into(self.data_buffer, offset, 0x40, 20,
             timestamp & 0xFFFFFFFF,
             int(lat * 2147483648.0 / 180.0),  # semicircles (signed)
             int(lon * 2147483648.0 / 180.0),  # semicircles (signed)
@@ -269,12 +339,39 @@ class FITFileWriter:
             int(cadence) & 0xFF,
             int(power) & 0xFFFF
         )
-        self.data_buffer += bytes([0x40, 20]) + msg
+        self._feed(offset)
+    
+    def add_records(self, timestamps, lats, lons, speeds, distances, cadences, powers):
+        """Add many record messages at once, packed with a single struct call.
+        
+        Each column may be any iterable, lists or generators alike. Records
+        carry no altitude field, so unlike add_record there is no altitude
+        column to convert.
+        """
+        semicircles = 2147483648.0 / 180.0  # degrees -> semicircles (signed)
+        values = []
+        for timestamp, lat, lon, speed, distance, cadence, power in zip(
+                timestamps, lats, lons, speeds, distances, cadences, powers):
+            values += (
+                0x40, 20,  # normal header + record type
+                timestamp & 0xFFFFFFFF,
+                int(lat * semicircles),
+                int(lon * semicircles),
+                int(speed) & 0xFFFFFFFF,
+                int(distance) & 0xFFFFFFFF,
+                int(cadence) & 0xFF,
+                int(power) & 0xFFFF,
+            )
+        count = len(values) // 9
+        offset = self._claim(count * self._RECORD_STRUCT.size)
+        struct.pack_into('<' + 'BBIiiIIBH' * count, self.data_buffer, offset, *values)
+        self._feed(offset)
     
     def add_lap(self, timestamp, start_time, total_distance, total_elapsed_time, avg_speed, max_speed,
                 avg_cadence, max_cadence, total_ascent, total_descent, sport, avg_power, max_power):
         """Add a lap message."""
-        msg = struct.pack('<IIIIIIHHHH',
+        offset = self._claim(self._LAP_STRUCT.size)
+        self._LAP_STRUCT.pack_into(self.data_buffer, offset, 0x40, 21,
             int(timestamp) & 0xFFFFFFFF,
             int(start_time) & 0xFFFFFFFF,
             int(total_elapsed_time) & 0xFFFFFFFF,
@@ -286,12 +383,13 @@ class FITFileWriter:
             int(max_cadence) & 0xFF,
             int(total_descent) & 0xFFFF
         )
-        self.data_buffer += bytes([0x40, 21]) + msg
+        self._feed(offset)
     
     def add_session(self, timestamp, start_time, total_distance, total_elapsed_time, avg_speed, max_speed,
                     avg_cadence, max_cadence, total_ascent, total_descent, sport, avg_power, max_power, num_laps):
         """Add a session message."""
-        msg = struct.pack('<IIIIIIHHHH',
+        offset = self._claim(self._SESSION_STRUCT.size)
+        self._SESSION_STRUCT.pack_into(self.data_buffer, offset, 0x40, 34,
             int(timestamp) & 0xFFFFFFFF,
             int(start_time) & 0xFFFFFFFF,
             int(total_elapsed_time) & 0xFFFFFFFF,
@@ -303,27 +401,63 @@ class FITFileWriter:
             int(max_cadence) & 0xFF,
             int(total_descent) & 0xFFFF
         )
-        self.data_buffer += bytes([0x40, 34]) + msg
+        self._feed(offset)
     
     def write_file(self):
         """Write the FIT file."""
+        # Only the packed part of the buffer, without copying it; its CRC
+        # was already accumulated message by message
+        data = memoryview(self.data_buffer)[:self._pos]
         with open(self.filepath, 'wb') as f:
-            data_crc = self._crc16(self.data_buffer)
-            data_size = len(self.data_buffer)
+            data_crc = self.crc
+            data_size = len(data)
             
             # Write header
-            f.write(bytes([FIT_HEADER_SIZE, FIT_PROTOCOL_VERSION]))
-            f.write(struct.pack('<H', FIT_PROFILE_VERSION))
-            f.write(struct.pack('<I', data_size))
-            f.write(b'.FIT')
+            f.write(self._HEADER_STRUCT.pack(FIT_HEADER_SIZE, FIT_PROTOCOL_VERSION,
+                                             FIT_PROFILE_VERSION, data_size, b'.FIT'))
             
             # Write data
-            f.write(self.data_buffer)
+            f.write(data)
             
             # Write footer (CRC16)
             f.write(struct.pack('<H', data_crc))
 
 
+def simulate_pressure_run(tire_pressure_bar, simulator=None):
+    """
+    Simulate one run (descent, turnaround, climb) at a tire pressure.
+    
+    Runs don't depend on each other or on the FIT file, so they can be
+    simulated in any order and serialized afterwards. Pass a simulator to
+    reuse it across runs: only the pressure-dependent rolling resistance
+    is recomputed.
+    
+    Returns:
+        (run, descent_samples, climb_start, max_descent_speed): run maps each
+        channel to its samples for the whole run, phase after phase
+    """
+    if simulator is None:
+        simulator = PhysicsSimulator(tire_pressure_bar)
+    else:
+        simulator.set_pressure(tire_pressure_bar)
+    
+    # Each phase appends straight onto the run's trace, so there are no
+    # per-phase traces to concatenate afterwards.
+    
+    # Phase 1: Descent (coasting down)
+    run, max_descent_speed = simulator.simulate_descent(duration_seconds=60)
+    descent_samples = len(run['time'])
+    
+    # Phase 2: Turnaround at bottom
+    simulator.simulate_turnaround(duration_seconds=5, trace=run)
+    climb_start = len(run['time'])
+    
+    # Phase 3: Climb back up (pedaling)
+    simulator.simulate_climb(duration_seconds=90, trace=run)
+    
+    return run, descent_samples, climb_start, max_descent_speed
+
+
 def generate_single_fit_file_with_three_runs():
     """Generate one FIT file with 3 runs at different tire pressures."""
     
@@ -332,6 +466,8 @@ def generate_single_fit_file_with_three_runs():
     start_lon = 21.0455
     end_lat = 52.2395
     end_lon = 21.0470
+    lat_span = end_lat - start_lat
+    lon_span = end_lon - start_lon
     
     # Three pressure configurations to test
     pressures_bar = [
@@ -360,106 +496,79 @@ def generate_single_fit_file_with_three_runs():
     global_time = 0
     run_results = []
     
-    # Generate each run
-    for front_bar, rear_bar, run_num in pressures_bar:
+    # Simulate every run first, so the FIT data buffer can be sized once
+    # for all records, one lap per run and the session
+    simulator = PhysicsSimulator(pressures_bar[0][0])
+    simulated_runs = [simulate_pressure_run(front_bar, simulator) for front_bar, _, _ in pressures_bar]
+    fit_writer.reserve(
+        records=sum(len(run['time']) for run, _, _, _ in simulated_runs),
+        laps=len(simulated_runs),
+        sessions=1,
+    )
+    
+    # Write each run
+    for (front_bar, rear_bar, run_num), (run, descent_samples, climb_start, max_descent_speed) in zip(
+            pressures_bar, simulated_runs):
         print(f'\n✓ Simulating Run {run_num}: {front_bar}/{rear_bar} bar...')
         
-        # Create physics simulator for this pressure
-        simulator = PhysicsSimulator(front_bar)
-        
-        # Phase 1: Descent (coasting down)
-        descent_data, max_descent_speed = simulator.simulate_descent(duration_seconds=60)
-        descent_duration = len(descent_data) * 0.1
-        
-        # Phase 2: Turnaround at bottom
-        turnaround_data = simulator.simulate_turnaround(duration_seconds=5)
-        
-        # Phase 3: Climb back up (pedaling)
-        climb_data = simulator.simulate_climb(duration_seconds=90)
-        climb_duration = len(climb_data) * 0.1
-        
-        all_run_data = descent_data + turnaround_data + climb_data
-        
-        # GPS path for descent
-        start_position = 0.0
-        end_position = STREET_LENGTH
-        
-        # Write records to FIT
-        distances = []
-        speeds = []
-        cadences = []
-        powers = []
-        elevations = []
-        
-        # Track descent and climb separately
-        descent_speeds = []
-        climb_speeds = []
-        climb_powers = []
+        times = run['time']
+        positions = run['position']
+        speeds = run['speed']
+        powers = run['power']
+        elevations = run['elevation']
+        cadences = run['cadence']
+        run_samples = len(times)
+        descent_duration = descent_samples * 0.1
+        climb_samples = run_samples - climb_start
+        climb_duration = climb_samples * 0.1
         
         run_start_time = global_time
         
-        for idx, data_point in enumerate(all_run_data):
-            time_offset = int(data_point['time'])
-            
-            # Interpolate GPS based on position along street
-            progress = min(1.0, data_point['position'] / STREET_LENGTH)
-            lat = start_lat + (end_lat - start_lat) * progress
-            lon = start_lon + (end_lon - start_lon) * progress
-            
-            elevation = data_point['elevation']
-            speed = data_point['speed']
-            cadence = data_point['cadence']
-            power = data_point['power']
-            
-            # Track metrics
-            distances.append(data_point['position'])
-            speeds.append(speed)
-            cadences.append(cadence)
-            powers.append(power)
-            elevations.append(elevation)
-            
-            # Track descent vs climb
-            if idx < len(descent_data):
-                descent_speeds.append(speed)
-            elif idx < len(descent_data) + len(turnaround_data):
-                pass  # Turnaround phase
-            else:
-                climb_speeds.append(speed)
-                climb_powers.append(power)
-            
-            # Add record
-            fit_writer.add_record(
-                timestamp=int(start_time + global_time + time_offset),
-                lat=lat,
-                lon=lon,
-                altitude=int(elevation * 100),  # cm
-                speed=int(speed * 1000),  # mm/s
-                distance=int(data_point['position'] * 100),  # cm
-                cadence=cadence,
-                power=power
-            )
+        # Write records to FIT, the whole run in one batch. GPS is
+        # interpolated from position along the street. The converted fields
+        # are only read once, by add_records, so they are generated on the
+        # fly instead of being stored as extra per-sample lists.
+        progresses = [min(1.0, position / STREET_LENGTH) for position in positions]
+        fit_writer.add_records(
+            timestamps=(int(start_time + global_time + int(time)) for time in times),
+            lats=(start_lat + lat_span * progress for progress in progresses),
+            lons=(start_lon + lon_span * progress for progress in progresses),
+            speeds=(int(speed * 1000) for speed in speeds),  # mm/s
+            distances=(int(position * 100) for position in positions),  # cm
+            cadences=cadences,
+            powers=powers,
+        )
         
-        # Calculate run statistics
-        run_duration = len(all_run_data) * 0.1  # 0.1 second per step
-        total_distance = max(distances) if distances else 0
-        avg_speed = sum(speeds) / len(speeds) if speeds else 0
-        max_speed = max(speeds) if speeds else 0
-        avg_cadence = sum(cadences) / len(cadences) if cadences else 0
-        max_cadence = max(cadences) if cadences else 0
-        avg_power = sum(powers) / len(powers) if powers else 0
-        max_power = max(powers) if powers else 0
-        elevation_loss = max(elevations) - min(elevations) if elevations else 0
+        # Calculate run statistics. Builtin reductions run straight over the
+        # run columns; the descent and climb are read through islice rather
+        # than copied out, and each guard is one sample-count check.
+        run_duration = run_samples * 0.1  # 0.1 second per step
+        if run_samples:
+            total_distance = max(positions)
+            avg_speed, max_speed = sum(speeds) / run_samples, max(speeds)
+            avg_cadence, max_cadence = sum(cadences) / run_samples, max(cadences)
+            avg_power, max_power = sum(powers) / run_samples, max(powers)
+            elevation_loss = max(elevations) - min(elevations)
+        else:
+            total_distance = avg_speed = max_speed = 0
+            avg_cadence = max_cadence = avg_power = max_power = elevation_loss = 0
         
         # Descent stats
-        max_descent = max(descent_speeds) if descent_speeds else 0
-        avg_descent_speed = sum(descent_speeds) / len(descent_speeds) if descent_speeds else 0
+        if descent_samples:
+            max_descent = max(islice(speeds, descent_samples))
+            avg_descent_speed = sum(islice(speeds, descent_samples)) / descent_samples
+        else:
+            max_descent = avg_descent_speed = 0
         
-        # Climb stats
-        avg_climb_speed = sum(climb_speeds) / len(climb_speeds) if climb_speeds else 0
-        avg_climb_power = sum(climb_powers) / len(climb_powers) if climb_powers else 0
+        # Climb stats (the turnaround counts toward neither phase)
+        if climb_samples:
+            avg_climb_speed = sum(islice(speeds, climb_start, None)) / climb_samples
+            avg_climb_power = sum(islice(powers, climb_start, None)) / climb_samples
+        else:
+            avg_climb_speed = avg_climb_power = 0
         
         # Add lap message
-        run_end_time = global_time + len(all_run_data) * 0.1
+        run_end_time = global_time + run_samples * 0.1
         fit_writer.add_lap(
             timestamp=start_time + int(run_end_time),
             start_time=start_time + run_start_time,
@@ -490,7 +599,7 @@ def generate_single_fit_file_with_three_runs():
             'avg_speed_kmh': avg_speed * 3.6,
         })
         
-        global_time += len(all_run_data) * 0.1 + 5  # Add gap between runs
+        global_time += run_samples * 0.1 + 5  # Add gap between runs
     
     # Add session message
     fit_writer.add_session(
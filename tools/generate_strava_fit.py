@@ -8,9 +8,15 @@ import struct
 import json
 import math
 import random
+import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
+# fit_crc.py lives at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import crc16_cc01
+
 # FIT Protocol constants
 FIT_HEADER_SIZE = 14
 FIT_PROTOCOL_VERSION = 0x20
@@ -41,110 +47,150 @@ ELEVATION_DROP = 25.0
 STREET_GRADIENT = ELEVATION_DROP / STREET_LENGTH
 STREET_ANGLE = math.atan(STREET_GRADIENT)
 
+# Degrees to FIT semicircles
+_SEMI_PER_DEG = (1 << 31) / 180.0
+
+# Message layouts, compiled once. Each starts with the normal header
+# (0x40) and message type bytes.
+_FILE_ID_STRUCT = struct.Struct('<BBBIHI')
+_DEV_INFO_STRUCT = struct.Struct('<BBIHB')
+_RECORD_FORMAT = 'BBIiiHBBHHIb'
+_RECORD_STRUCT = struct.Struct('<' + _RECORD_FORMAT)
+_EVENT_STRUCT = struct.Struct('<BBIBB')
+_LAP_STRUCT = struct.Struct('<BBIIHBIIIIBBHH')
+_SESSION_STRUCT = struct.Struct('<BBIIBBIIIIBBHHIB')
+
+
+def _integrate_descent(num_steps, dt, mass, gravity_force, rolling_force, drag_k):
+    """Integrate a coast down the street from a standing start.
+    
+    Returns (speeds, positions, brake_forces) lists, one entry per step.
+    """
+    speeds, positions, brake_forces = [], [], []
+    speed = 0.0
+    position = 0.0
+    brake_position = STREET_LENGTH * 0.8
+    brake_span = STREET_LENGTH - brake_position
+    
+    for step in range(num_steps):
+        if position >= brake_position:
+            brake_force = 400 * ((position - brake_position) / brake_span)
+        else:
+            brake_force = 0
+        
+        net_force = gravity_force - rolling_force - drag_k * (speed * speed) - brake_force
+        speed += net_force / mass * dt
+        if speed < 0:
+            speed = 0
+        position += speed * dt
+        if position > STREET_LENGTH:
+            position = STREET_LENGTH
+        
+        speeds.append(speed)
+        positions.append(position)
+        brake_forces.append(brake_force)
+        
+        if position >= STREET_LENGTH and speed < 1.0:
+            break
+    
+    return speeds, positions, brake_forces
+
+
+def _integrate_climb(num_steps, dt, mass, gravity_force, rolling_force, drag_k, pedal_power):
+    """Integrate pedaling back up the street from the bottom.
+    
+    Returns (speeds, positions) lists, one entry per step.
+    """
+    speeds, positions = [], []
+    position = STREET_LENGTH
+    speed = 2.0
+    
+    for step in range(num_steps):
+        if speed > 0.5:
+            pedal_force = pedal_power / speed
+        else:
+            pedal_force = 200
+        
+        net_force = pedal_force - gravity_force - rolling_force - drag_k * (speed * speed)
+        speed += net_force / mass * dt
+        if speed < 0.5:
+            speed = 0.5
+        position -= speed * dt
+        if position < 0:
+            position = 0
+        
+        speeds.append(speed)
+        positions.append(position)
+        
+        if position <= 0:
+            break
+    
+    return speeds, positions
+
+
+def _trace(dt, positions, speeds, powers, elevations, cadences):
+    """Bundle per-step columns into a simulation result; time starts at 0."""
+    return {
+        'time': [step * dt for step in range(len(positions))],
+        'position': positions,
+        'speed': speeds,
+        'power': powers,
+        'elevation': elevations,
+        'cadence': cadences,
+    }
+
 
 class PhysicsSimulator:
-    """Realistic cycling physics."""
+    """Realistic cycling physics.
+    
+    The simulate_* methods return one list per field ('time', 'position',
+    'speed', 'power', 'elevation', 'cadence'), indexed by step.
+    """
     
     def __init__(self, tire_pressure_bar):
         self.pressure = tire_pressure_bar
         self.mass = TOTAL_MASS
         self.crr = max(0.003, 0.008 - 0.0006 * (tire_pressure_bar - 3.0))
-    
-    def _rolling_resistance(self, speed_ms):
-        normal_force = self.mass * GRAVITY * math.cos(STREET_ANGLE)
-        return self.crr * normal_force
-    
-    def _air_drag(self, speed_ms):
-        return 0.5 * AIR_DENSITY * CD * FRONTAL_AREA * (speed_ms ** 2)
-    
-    def _gravity_component(self):
-        return self.mass * GRAVITY * math.sin(STREET_ANGLE)
+        
+        # Forces that are the same at every step: gravity along the slope,
+        # rolling resistance (Crr * normal force), and the drag factor
+        # (drag is drag_k * speed^2)
+        self.gravity_along = self.mass * GRAVITY * math.sin(STREET_ANGLE)
+        self.normal_force = self.mass * GRAVITY * math.cos(STREET_ANGLE)
+        self.roll_force = self.crr * self.normal_force
+        self.drag_k = 0.5 * AIR_DENSITY * CD * FRONTAL_AREA
     
     def simulate_descent(self, duration_seconds=40):
-        data = []
-        speed = 0.0
-        position = 0.0
         dt = 0.1
+        speeds, positions, brake_forces = _integrate_descent(
+            int(duration_seconds / dt), dt, self.mass,
+            self.gravity_along, self.roll_force, self.drag_k)
         
-        for step in range(int(duration_seconds / dt)):
-            time = step * dt
-            
-            gravity_force = self._gravity_component()
-            rolling_force = self._rolling_resistance(speed)
-            drag_force = self._air_drag(speed)
-            
-            brake_position = STREET_LENGTH * 0.8
-            if position >= brake_position:
-                brake_intensity = (position - brake_position) / (STREET_LENGTH - brake_position)
-                brake_force = 400 * brake_intensity
-            else:
-                brake_force = 0
-            
-            net_force = gravity_force - rolling_force - drag_force - brake_force
-            acceleration = net_force / self.mass
-            speed = max(0, speed + acceleration * dt)
-            position = min(STREET_LENGTH, position + speed * dt)
-            
-            elevation = 100.0 - (position / STREET_LENGTH) * ELEVATION_DROP
-            cadence = 0 if speed < 5 else int(30 + (speed - 5) * 2)
-            power = int(speed * brake_force)
-            
-            data.append({
-                'time': time,
-                'position': position,
-                'speed': speed,
-                'power': power,
-                'elevation': elevation,
-                'cadence': min(120, cadence),
-            })
-            
-            if position >= STREET_LENGTH and speed < 1.0:
-                break
+        # Elevation, cadence and braking power, one pass per channel
+        elevations = [100.0 - (p / STREET_LENGTH) * ELEVATION_DROP for p in positions]
+        cadences = [0 if v < 5 else min(120, int(30 + (v - 5) * 2)) for v in speeds]
+        powers = [int(v * f) for v, f in zip(speeds, brake_forces)]
         
-        return data
+        return _trace(dt, positions, speeds, powers, elevations, cadences)
     
     def simulate_climb(self, duration_seconds=90):
-        data = []
-        position = STREET_LENGTH
-        speed = 2.0
         pedal_power = 300
         dt = 0.1
+        speeds, positions = _integrate_climb(
+            int(duration_seconds / dt), dt, self.mass,
+            self.gravity_along, self.roll_force, self.drag_k, pedal_power)
         
-        for step in range(int(duration_seconds / dt)):
-            time = step * dt
-            
-            gravity_force = self._gravity_component()
-            rolling_force = self._rolling_resistance(speed)
-            drag_force = self._air_drag(speed)
-            
-            if speed > 0.5:
-                pedal_force = pedal_power / speed
-            else:
-                pedal_force = 200
-            
-            net_force = pedal_force - gravity_force - rolling_force - drag_force
-            acceleration = net_force / self.mass
-            speed = max(0.5, speed + acceleration * dt)
-            position = max(0, position - speed * dt)
-            
-            elevation = 100.0 - (position / STREET_LENGTH) * ELEVATION_DROP
-            cadence = int(85 + random.gauss(0, 5))
-            cadence = max(70, min(110, cadence))
-            power = pedal_power + int(random.gauss(0, 10))
-            
-            data.append({
-                'time': time,
-                'position': position,
-                'speed': speed,
-                'power': power,
-                'elevation': elevation,
-                'cadence': cadence,
-            })
-            
-            if position <= 0:
-                break
+        elevations = [100.0 - (p / STREET_LENGTH) * ELEVATION_DROP for p in positions]
         
-        return data
+        # Cadence and power noise don't feed back into the motion, so each
+        # channel is drawn as one batch once the step count is known
+        gauss = random.gauss
+        cadence_noise = [gauss(0, 5) for _ in positions]
+        power_noise = [gauss(0, 10) for _ in positions]
+        cadences = [max(70, min(110, int(85 + n))) for n in cadence_noise]
+        powers = [pedal_power + int(n) for n in power_noise]
+        
+        return _trace(dt, positions, speeds, powers, elevations, cadences)
 
 
 class FITWriter:
@@ -152,20 +198,30 @@ class FITWriter:
     
     def __init__(self, filepath):
         self.filepath = filepath
-        self.records = []
+        # FIT data section; messages are packed in place, in file order.
+        # _buf[:_pos] is the data written so far, the rest is spare room.
+        self._buf = bytearray()
+        self._pos = 0
+        # CRC of _buf[:_pos], kept up to date as messages are packed
+        self._crc = 0
         self.base_time = int(datetime.now().timestamp())
     
-    def _crc16(self, data):
-        """Calculate CRC-16 CCITT."""
-        crc = 0
-        for byte in data:
-            crc = ((crc << 8) ^ byte) & 0xFFFF
-            for _ in range(8):
-                if crc & 0x8000:
-                    crc = ((crc << 1) ^ 0xCC01) & 0xFFFF
-                else:
-                    crc = (crc << 1) & 0xFFFF
-        return crc
+    def _crc16(self, data, crc=0):
+        """Calculate the file CRC (0xCC01, table-driven), continuing from crc."""
+        return crc16_cc01(data, crc)
+    
+    def _claim(self, size):
+        """Return the offset of the next size bytes of the data section."""
+        offset = self._pos
+        self._pos += size
+        if self._pos > len(self._buf):
+            # Grow at least twofold, so packing stays amortized O(1)
+            self._buf.extend(bytes(max(self._pos, 2 * len(self._buf)) - len(self._buf)))
+        return offset
+    
+    def _feed(self, offset):
+        """Fold the bytes packed since offset into the running CRC, while they're hot."""
+        self._crc = self._crc16(memoryview(self._buf)[offset:self._pos], self._crc)
     
     def add_file_id(self):
         """File ID message (type 0)."""
@@ -176,112 +232,119 @@ class FITWriter:
         # Field 3: serial_number
         # Field 4: time_created
         
-        data = struct.pack('<BI', 4, 1)  # type + manufacturer
-        data += struct.pack('<H', 0)      # product
-        data += struct.pack('<I', 12345)  # serial number
-        
-        self.records.append((MSG_FILE_ID, data))
+        offset = self._claim(_FILE_ID_STRUCT.size)
+        _FILE_ID_STRUCT.pack_into(self._buf, offset, 0x40, MSG_FILE_ID, 4, 1, 0, 12345)
+        self._feed(offset)
     
     def add_device_info(self, timestamp):
         """Device info message."""
-        data = struct.pack('<I', timestamp)  # timestamp
-        data += struct.pack('<H', 0)          # device index
-        data += struct.pack('<B', 0)          # battery status
-        
-        self.records.append((MSG_DEVICE_INFO, data))
+        # timestamp, device index, battery status
+        offset = self._claim(_DEV_INFO_STRUCT.size)
+        _DEV_INFO_STRUCT.pack_into(self._buf, offset, 0x40, MSG_DEVICE_INFO, timestamp, 0, 0)
+        self._feed(offset)
     
     def add_record(self, timestamp, lat, lon, altitude, speed, distance, cadence, power):
         """Record message (type 20) - sensor data."""
-        data = struct.pack('<I', timestamp)
-        
-        # Position (lat/lon in semicircles)
-        lat_semicircles = int(lat * (2**31) / 180.0)
-        lon_semicircles = int(lon * (2**31) / 180.0)
-        data += struct.pack('<i', lat_semicircles)
-        data += struct.pack('<i', lon_semicircles)
-        
-        # Altitude (m)
-        data += struct.pack('<H', int(altitude * 5) + 500)  # FIT format: (alt*5)+500
-        
-        # Heart rate (use 0 since we don't have it)
-        data += struct.pack('<B', 0xff)
-        
-        # Cadence (RPM)
-        data += struct.pack('<B', int(cadence))
-        
-        # Speed (m/s * 100)
-        data += struct.pack('<H', int(speed * 100))
-        
-        # Power (watts)
-        data += struct.pack('<H', int(power) & 0xFFFF)
-        
-        # Distance (m * 100)
-        data += struct.pack('<I', int(distance * 100))
-        
-        # Temperature (use 0)
-        data += struct.pack('<b', 25)
-        
-        self.records.append((MSG_RECORD, data))
+        offset = self._claim(_RECORD_STRUCT.size)
+        _RECORD_STRUCT.pack_into(self._buf, offset,
+            0x40, MSG_RECORD,
+            timestamp,
+            int(lat * _SEMI_PER_DEG),     # position in semicircles
+            int(lon * _SEMI_PER_DEG),
+            int(altitude * 5) + 500,      # FIT format: (alt*5)+500
+            0xff,                         # heart rate (none)
+            int(cadence),                 # RPM
+            int(speed * 100),             # m/s * 100
+            int(power) & 0xFFFF,          # watts
+            int(distance * 100),          # m * 100
+            25,                           # temperature
+        )
+        self._feed(offset)
+    
+    def add_records(self, timestamps, lats, lons, altitudes, speeds, distances, cadences, powers):
+        """Record messages for many samples at once, packed with a single struct call.
+        
+        Takes one iterable per add_record argument.
+        """
+        values = []
+        for timestamp, lat, lon, altitude, speed, distance, cadence, power in zip(
+                timestamps, lats, lons, altitudes, speeds, distances, cadences, powers):
+            values += (
+                0x40, MSG_RECORD,
+                timestamp,
+                int(lat * _SEMI_PER_DEG),
+                int(lon * _SEMI_PER_DEG),
+                int(altitude * 5) + 500,
+                0xff,
+                int(cadence),
+                int(speed * 100),
+                int(power) & 0xFFFF,
+                int(distance * 100),
+                25,
+            )
+        count = len(values) // 12
+        offset = self._claim(count * _RECORD_STRUCT.size)
+        struct.pack_into('<' + _RECORD_FORMAT * count, self._buf, offset, *values)
+        self._feed(offset)
     
     def add_event(self, timestamp, event_type=0):
         """Event message - marks lap/segment."""
-        data = struct.pack('<I', timestamp)
-        data += struct.pack('<BB', event_type, 0)  # event type and data
-        
-        self.records.append((MSG_EVENT, data))
+        # event type and data
+        offset = self._claim(_EVENT_STRUCT.size)
+        _EVENT_STRUCT.pack_into(self._buf, offset, 0x40, MSG_EVENT, timestamp, event_type, 0)
+        self._feed(offset)
     
     def add_lap(self, timestamp, start_time, total_distance, total_elapsed_time, 
                 avg_speed, max_speed, avg_cadence, max_cadence, avg_power, max_power,
                 total_descent, num_laps):
         """Lap message (type 19)."""
-        data = struct.pack('<I', timestamp)        # timestamp
-        data += struct.pack('<I', start_time)       # start_time
-        data += struct.pack('<H', 1)                # event (1 = lap)
-        data += struct.pack('<B', 0)                # event type
-        data += struct.pack('<I', int(total_elapsed_time))  # total_elapsed_time (ms)
-        data += struct.pack('<I', int(total_distance))      # total_distance (m*100)
-        data += struct.pack('<I', int(avg_speed))           # avg_speed (m/s*100)
-        data += struct.pack('<I', int(max_speed))           # max_speed
-        data += struct.pack('<B', int(avg_cadence))         # avg_cadence
-        data += struct.pack('<B', int(max_cadence))         # max_cadence
-        data += struct.pack('<H', int(avg_power) & 0xFFFF)  # avg_power (watts)
-        data += struct.pack('<H', int(max_power) & 0xFFFF)  # max_power
-        
-        self.records.append((MSG_LAP, data))
+        offset = self._claim(_LAP_STRUCT.size)
+        _LAP_STRUCT.pack_into(self._buf, offset,
+            0x40, MSG_LAP,
+            timestamp,
+            start_time,
+            1,                               # event (1 = lap)
+            0,                               # event type
+            int(total_elapsed_time),         # total_elapsed_time (ms)
+            int(total_distance),             # total_distance (m*100)
+            int(avg_speed),                  # avg_speed (m/s*100)
+            int(max_speed),                  # max_speed
+            int(avg_cadence),
+            int(max_cadence),
+            int(avg_power) & 0xFFFF,         # avg_power (watts)
+            int(max_power) & 0xFFFF,         # max_power
+        )
+        self._feed(offset)
     
     def add_session(self, timestamp, start_time, total_distance, total_elapsed_time,
                     avg_speed, max_speed, avg_cadence, max_cadence, avg_power, max_power,
                     total_descent, num_laps):
         """Session message (type 18)."""
-        data = struct.pack('<I', timestamp)        # timestamp
-        data += struct.pack('<I', start_time)       # start_time
-        data += struct.pack('<B', 1)                # sport (1=cycling)
-        data += struct.pack('<B', 0)                # sub_sport
-        data += struct.pack('<I', int(total_elapsed_time))
-        data += struct.pack('<I', int(total_distance))
-        data += struct.pack('<I', int(avg_speed))
-        data += struct.pack('<I', int(max_speed))
-        data += struct.pack('<B', int(avg_cadence))
-        data += struct.pack('<B', int(max_cadence))
-        data += struct.pack('<H', int(avg_power) & 0xFFFF)
-        data += struct.pack('<H', int(max_power) & 0xFFFF)
-        data += struct.pack('<I', int(total_descent))
-        data += struct.pack('<B', int(num_laps))
-        
-        self.records.append((MSG_SESSION, data))
+        offset = self._claim(_SESSION_STRUCT.size)
+        _SESSION_STRUCT.pack_into(self._buf, offset,
+            0x40, MSG_SESSION,
+            timestamp,
+            start_time,
+            1,                               # sport (1=cycling)
+            0,                               # sub_sport
+            int(total_elapsed_time),
+            int(total_distance),
+            int(avg_speed),
+            int(max_speed),
+            int(avg_cadence),
+            int(max_cadence),
+            int(avg_power) & 0xFFFF,
+            int(max_power) & 0xFFFF,
+            int(total_descent),
+            int(num_laps),
+        )
+        self._feed(offset)
     
     def write(self):
         """Write FIT file to disk."""
-        # Build data buffer
-        data_buffer = b''
-        
-        for msg_type, msg_data in self.records:
-            # Message header (normal header = 0x40 + type)
-            data_buffer += bytes([0x40, msg_type])
-            data_buffer += msg_data
-        
-        # Calculate CRC
-        data_crc = self._crc16(data_buffer)
+        # Only the packed part of the buffer, without copying it
+        data_buffer = memoryview(self._buf)[:self._pos]
+        data_crc = self._crc
         
         # Write file
         with open(self.filepath, 'wb') as f:
@@ -298,6 +361,19 @@ class FITWriter:
             f.write(struct.pack('<H', data_crc))
 
 
+def simulate_pressure_run(pressure_bar):
+    """Simulate one run (descent, then climb) at a tire pressure.
+    
+    Runs depend neither on each other nor on the FIT file, so they can be
+    simulated up front and serialized afterwards.
+    
+    Returns:
+        (descent, climb) simulation results
+    """
+    sim = PhysicsSimulator(pressure_bar)
+    return sim.simulate_descent(60), sim.simulate_climb(90)
+
+
 def generate():
     """Generate continuous FIT file with 3 runs."""
     
@@ -305,6 +381,8 @@ def generate():
     start_lon = 21.0455
     end_lat = 52.2395
     end_lon = 21.0470
+    lat_span = end_lat - start_lat
+    lon_span = end_lon - start_lon
     
     pressures = [(3.5, 1), (4.4, 2), (5.0, 3)]
     
@@ -323,81 +401,70 @@ def generate():
     print('Generating Strava-Compatible FIT File')
     print('=' * 70)
     
-    for pressure_bar, run_num in pressures:
+    simulated_runs = [simulate_pressure_run(pressure_bar) for pressure_bar, _ in pressures]
+    
+    for (pressure_bar, run_num), (descent, climb) in zip(pressures, simulated_runs):
         print(f'\n✓ Run {run_num}: {pressure_bar} bar')
         
-        sim = PhysicsSimulator(pressure_bar)
-        descent_data = sim.simulate_descent(60)
-        climb_data = sim.simulate_climb(90)
-        run_data = descent_data + climb_data
-        
         # Add device info at start of run
         writer.add_device_info(base_time + int(global_time))
         
         run_start_time = base_time + int(global_time)
         
-        # Collect stats
-        all_speeds = []
-        all_powers = []
-        all_elevations = []
-        all_cadences = []
-        all_positions = []
-        descent_speeds = []
-        climb_speeds = []
-        climb_powers = []
-        
-        # Write records
-        for idx, point in enumerate(run_data):
-            timestamp = int(base_time + global_time + point['time'])
-            
-            # GPS
-            progress = min(1.0, point['position'] / STREET_LENGTH)
-            lat = start_lat + (end_lat - start_lat) * progress
-            lon = start_lon + (end_lon - start_lon) * progress
-            
-            elevation = point['elevation']
-            speed = point['speed']
-            cadence = point['cadence']
-            power = point['power']
-            
-            all_speeds.append(speed)
-            all_powers.append(power)
-            all_elevations.append(elevation)
-            all_cadences.append(cadence)
-            all_positions.append(point['position'])
-            
-            if idx < len(descent_data):
-                descent_speeds.append(speed)
-            else:
-                climb_speeds.append(speed)
-                climb_powers.append(power)
-            
-            writer.add_record(
-                timestamp=timestamp,
-                lat=lat,
-                lon=lon,
-                altitude=elevation,
-                speed=speed,
-                distance=point['position'],
-                cadence=cadence,
-                power=power
-            )
-        
-        # Calculate stats
-        run_duration = len(run_data) * 0.1
-        total_distance = max(all_positions) if all_positions else 0
-        avg_speed = sum(all_speeds) / len(all_speeds) if all_speeds else 0
-        max_speed = max(all_speeds) if all_speeds else 0
-        avg_cadence = sum(all_cadences) / len(all_cadences) if all_cadences else 0
-        max_cadence = max(all_cadences) if all_cadences else 0
-        avg_power = sum(all_powers) / len(all_powers) if all_powers else 0
-        max_power = max(all_powers) if all_powers else 0
-        elevation_loss = max(all_elevations) - min(all_elevations) if all_elevations else 0
+        # Whole-run columns, descent followed by climb
+        times = descent['time'] + climb['time']
+        positions = descent['position'] + climb['position']
+        speeds = descent['speed'] + climb['speed']
+        powers = descent['power'] + climb['power']
+        elevations = descent['elevation'] + climb['elevation']
+        cadences = descent['cadence'] + climb['cadence']
+        
+        # GPS, interpolated along the street for the whole run at once
+        progresses = [min(1.0, position / STREET_LENGTH) for position in positions]
+        lats = [start_lat + lat_span * progress for progress in progresses]
+        lons = [start_lon + lon_span * progress for progress in progresses]
+        
+        # Write records, the whole run in one batch
+        writer.add_records(
+            timestamps=[int(base_time + global_time + time) for time in times],
+            lats=lats,
+            lons=lons,
+            altitudes=elevations,
+            speeds=speeds,
+            distances=positions,
+            cadences=cadences,
+            powers=powers,
+        )
         
-        max_descent = max(descent_speeds) if descent_speeds else 0
-        avg_descent = sum(descent_speeds) / len(descent_speeds) if descent_speeds else 0
-        avg_climb = sum(climb_speeds) / len(climb_speeds) if climb_speeds else 0
-        avg_climb_power = sum(climb_powers) / len(climb_powers) if climb_powers else 0
+        # Calculate stats. Builtin reductions run straight over the run
+        # columns, each phase is read from its own simulator columns, and
+        # each guard is one sample-count check.
+        run_samples = len(times)
+        run_duration = run_samples * 0.1
+        if run_samples:
+            total_distance = max(positions)
+            avg_speed, max_speed = sum(speeds) / run_samples, max(speeds)
+            avg_cadence, max_cadence = sum(cadences) / run_samples, max(cadences)
+            avg_power, max_power = sum(powers) / run_samples, max(powers)
+            elevation_loss = max(elevations) - min(elevations)
+        else:
+            total_distance = avg_speed = max_speed = 0
+            avg_cadence = max_cadence = avg_power = max_power = elevation_loss = 0
+        
+        descent_speeds = descent['speed']
+        descent_samples = len(descent_speeds)
+        if descent_samples:
+            max_descent = max(descent_speeds)
+            avg_descent = sum(descent_speeds) / descent_samples
+        else:
+            max_descent = avg_descent = 0
+        
+        climb_samples = len(climb['speed'])
+        if climb_samples:
+            avg_climb = sum(climb['speed']) / climb_samples
+            avg_climb_power = sum(climb['power']) / climb_samples
+        else:
+            avg_climb = avg_climb_power = 0
         
         # Add lap
         run_end_time = base_time + int(global_time + run_duration)
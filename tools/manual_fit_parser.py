@@ -1,49 +1,27 @@
+import io
+import mmap
+import os
 import struct
 import sys
 
-# CRC-16/CCITT from the FIT SDK
-CRC_TABLE = [
-    0x0000, 0x1021, 0x2042, 0x3063, 0x4084, 0x50a5, 0x60c6, 0x70e7,
-    0x8108, 0x9129, 0xa14a, 0xb16b, 0xc18c, 0xd1ad, 0xe1ce, 0xf1ef,
-    0x1231, 0x0210, 0x3273, 0x2252, 0x52b5, 0x4294, 0x72f7, 0x62d6,
-    0x9339, 0x8318, 0xb37b, 0xa35a, 0xd3bd, 0xc39c, 0xf3ff, 0xe3de,
-    0x2462, 0x3443, 0x0420, 0x1401, 0x64e6, 0x74c7, 0x44a4, 0x5485,
-    0xa56a, 0xb54b, 0x8528, 0x9509, 0xe5ee, 0xf5cf, 0xc5ac, 0xd58d,
-    0x3653, 0x2672, 0x1611, 0x0630, 0x76d7, 0x66f6, 0x5695, 0x46b4,
-    0xb75b, 0xa77a, 0x9719, 0x8738, 0xf7df, 0xe7fe, 0xd79d, 0xc7bc,
-    0x48c4, 0x58e5, 0x6886, 0x78a7, 0x0840, 0x1861, 0x2802, 0x3823,
-    0xc9cc, 0xd9ed, 0xe98e, 0xf9af, 0x8948, 0x9969, 0xa90a, 0xb92b,
-    0x5af5, 0x4ad4, 0x7ab7, 0x6a96, 0x1a71, 0x0a50, 0x3a33, 0x2a12,
-    0xdbfd, 0xcbdc, 0xfbbf, 0xeb9e, 0x9b79, 0x8b58, 0xbb3b, 0xab1a,
-    0x6ca6, 0x7c87, 0x4ce4, 0x5cc5, 0x2c22, 0x3c03, 0x0c60, 0x1c41,
-    0xedae, 0xfd8f, 0xcdec, 0xddcd, 0xad2a, 0xbd0b, 0x8d68, 0x9d49,
-    0x7e97, 0x6eb6, 0x5ed5, 0x4ef4, 0x3e13, 0x2e32, 0x1e51, 0x0e70,
-    0xff9f, 0xefbe, 0xdfdd, 0xcffc, 0xbf1b, 0xaf3a, 0x9f59, 0x8f78,
-    0x9188, 0x81a9, 0xb1ca, 0xa1eb, 0xd10c, 0xc12d, 0xf14e, 0xe16f,
-    0x1080, 0x00a1, 0x30c2, 0x20e3, 0x5004, 0x4025, 0x7046, 0x6067,
-    0x83b9, 0x9398, 0xa3fb, 0xb3da, 0xc33d, 0xd31c, 0xe37f, 0xf35e,
-    0x02b1, 0x1290, 0x22f3, 0x32d2, 0x4235, 0x5214, 0x6277, 0x7256,
-    0xb5ea, 0xa5cb, 0x95a8, 0x8589, 0xf56e, 0xe54f, 0xd52c, 0xc50d,
-    0x34e2, 0x24c3, 0x14a0, 0x0481, 0x7466, 0x6447, 0x5424, 0x4405,
-    0xa7db, 0xb7fa, 0x8799, 0x97b8, 0xe75f, 0xf77e, 0xc71d, 0xd73c,
-    0x26d3, 0x36f2, 0x0691, 0x16b0, 0x6657, 0x7676, 0x4615, 0x5634,
-    0xd94c, 0xc96d, 0xf90e, 0xe92f, 0x99c8, 0x89e9, 0xb98a, 0xa9ab,
-    0x5844, 0x4865, 0x7806, 0x6827, 0x18c0, 0x08e1, 0x3882, 0x28a3,
-    0xcb7d, 0xdb5c, 0xeb3f, 0xfb1e, 0x8bf9, 0x9bd8, 0xabbb, 0xbb9a,
-    0x4a75, 0x5a54, 0x6a37, 0x7a16, 0x0af1, 0x1ad0, 0x2ab3, 0x3a92,
-    0xfd2e, 0xed0f, 0xdd6c, 0xcd4d, 0xbdaa, 0xad8b, 0x9de8, 0x8dc9,
-    0x7c26, 0x6c07, 0x5c64, 0x4c45, 0x3ca2, 0x2c83, 0x1ce0, 0x0cc1,
-    0xef1f, 0xff3e, 0xcf5d, 0xdf7c, 0xaf9b, 0xbfba, 0x8fd9, 0x9ff8,
-    0x6e17, 0x7e36, 0x4e55, 0x5e74, 0x2e93, 0x3eb2, 0x0ed1, 0x1ef0,
-]
+# fit_crc.py lives at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from fit_crc import crc16_ccitt_low_byte
+
+# Buffered report text is handed to stdout once it grows past this many
+# characters, so long files don't hold their whole report in memory
+FLUSH_CHARS = 1 << 16
+
+# Pre-compiled readers for the fixed-width fields: (buffer, offset) -> tuple
+_U16LE = struct.Struct('<H').unpack_from
+_U32LE = struct.Struct('<I').unpack_from
+_U32BE = struct.Struct('>I').unpack_from
+
 
 def get_crc(data):
-    crc = 0
-    for byte in data:
-        crc = (crc << 8) & 0xFFFF
-        crc ^= CRC_TABLE[(crc >> 8) ^ byte]
-        crc &= 0xFFFF
-    return crc
+    # The CCITT table indexed by the low byte of the running CRC, as this
+    # parser has always checked; it is not binascii.crc_hqx
+    return crc16_ccitt_low_byte(data)
 
 BASE_TYPE_FORMAT = {
     0: 'B',  # enum
@@ -129,38 +107,60 @@ MESSAGE_TYPES = {
 
 
 def parse_file(file_path):
+    # Build the report in a StringIO rather than a print() per field, and
+    # write it out in large chunks; whatever was collected is still written
+    # if parsing fails
+    out = io.StringIO()
+    try:
+        # Map the file rather than reading it in; pages are only loaded as
+        # the parser walks over them
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as file_bytes:
+            _parse_bytes(file_path, file_bytes, out)
+    finally:
+        sys.stdout.write(out.getvalue())
+
+
+def _flush(out):
+    """Move the report text buffered in out to stdout."""
+    sys.stdout.write(out.getvalue())
+    out.seek(0)
+    out.truncate()
+
+
+def _parse_bytes(file_path, file_bytes, out):
+    """Parse the FIT data in file_bytes, writing the report lines to out."""
+    w = out.write
     definitions = {}
-    file_bytes = b''
-    with open(file_path, 'rb') as f:
-        file_bytes = f.read()
 
     # 1. Header
     header_size = file_bytes[0]
     protocol_version = file_bytes[1]
-    profile_version = struct.unpack('<H', file_bytes[2:4])[0]
-    data_size = struct.unpack('<I', file_bytes[4:8])[0]
+    profile_version = _U16LE(file_bytes, 2)[0]
+    data_size = _U32LE(file_bytes, 4)[0]
     data_type = file_bytes[8:12].decode('ascii')
-    header_crc = struct.unpack('<H', file_bytes[12:14])[0] if header_size == 14 else None
+    header_crc = _U16LE(file_bytes, 12)[0] if header_size == 14 else None
 
-    print(f"--- FIT File: {file_path} ---")
-    print(f"Header Size: {header_size}")
-    print(f"Protocol Version: {protocol_version}")
-    print(f"Profile Version: {profile_version}")
-    print(f"Data Size: {data_size} bytes")
-    print(f"Data Type: '{data_type}'")
+    w(f"--- FIT File: {file_path} ---\n")
+    w(f"Header Size: {header_size}\n")
+    w(f"Protocol Version: {protocol_version}\n")
+    w(f"Profile Version: {profile_version}\n")
+    w(f"Data Size: {data_size} bytes\n")
+    w(f"Data Type: '{data_type}'\n")
 
     if header_crc is not None:
         calculated_header_crc = get_crc(file_bytes[0:12])
-        print(f"Header CRC: {header_crc} (Calculated: {calculated_header_crc}) -> {'OK' if header_crc == calculated_header_crc else 'FAIL'}")
+        w(f"Header CRC: {header_crc} (Calculated: {calculated_header_crc}) -> {'OK' if header_crc == calculated_header_crc else 'FAIL'}\n")
     else:
-        print("Header CRC: Not present")
+        w("Header CRC: Not present\n")
 
-    print("\n--- Records ---")
+    w("\n--- Records ---\n")
     
     # 2. Data Records
     pointer = header_size
     while pointer < header_size + data_size:
-        print(f"\n@ Byte {pointer}")
+        if out.tell() >= FLUSH_CHARS:
+            _flush(out)
+        w(f"\n@ Byte {pointer}\n")
         record_header = file_bytes[pointer]
         pointer += 1
 
@@ -171,13 +171,13 @@ def parse_file(file_path):
             # Definition Message
             reserved = file_bytes[pointer]
             architecture = file_bytes[pointer + 1]
-            global_msg_num = struct.unpack('<H', file_bytes[pointer + 2:pointer + 4])[0]
+            global_msg_num = _U16LE(file_bytes, pointer + 2)[0]
             num_fields = file_bytes[pointer + 4]
             
-            print(f"  [DEFINITION] Local Msg Type: {local_msg_type}")
-            print(f"    Global Msg Num: {global_msg_num} ({MESSAGE_TYPES.get(global_msg_num, 'Unknown')})")
-            print(f"    Architecture: {'Big' if architecture else 'Little'} Endian")
-            print(f"    Num Fields: {num_fields}")
+            w(f"  [DEFINITION] Local Msg Type: {local_msg_type}\n")
+            w(f"    Global Msg Num: {global_msg_num} ({MESSAGE_TYPES.get(global_msg_num, 'Unknown')})\n")
+            w(f"    Architecture: {'Big' if architecture else 'Little'} Endian\n")
+            w(f"    Num Fields: {num_fields}\n")
 
             fields = []
             field_pointer = pointer + 5
@@ -189,7 +189,7 @@ def parse_file(file_path):
                 fields.append({'def_num': field_def_num, 'size': field_size, 'type': base_type})
                 field_pointer += 3
                 total_size += field_size
-                print(f"      Field {i+1}: Def Num={field_def_num}, Size={field_size}, Base Type={base_type}")
+                w(f"      Field {i+1}: Def Num={field_def_num}, Size={field_size}, Base Type={base_type}\n")
 
             definitions[local_msg_type] = {
                 'global_msg_num': global_msg_num,
@@ -199,48 +199,46 @@ def parse_file(file_path):
             pointer = field_pointer
         else:
             # Data Message
-            print(f"  [DATA] Local Msg Type: {local_msg_type}")
+            w(f"  [DATA] Local Msg Type: {local_msg_type}\n")
             if local_msg_type in definitions:
                 definition = definitions[local_msg_type]
-                print(f"    Global Msg Num: {definition['global_msg_num']} ({MESSAGE_TYPES.get(definition['global_msg_num'], 'Unknown')})")
-                
-                data_bytes = file_bytes[pointer : pointer + definition['total_size']]
+                w(f"    Global Msg Num: {definition['global_msg_num']} ({MESSAGE_TYPES.get(definition['global_msg_num'], 'Unknown')})\n")
                 
-                field_offset = 0
+                field_offset = pointer
                 for i, field in enumerate(definition['fields']):
-                    field_bytes = data_bytes[field_offset : field_offset + field['size']]
+                    field_bytes = file_bytes[field_offset : field_offset + field['size']]
                     
                     # This is a simplified parser, doesn't handle all types or endianness correctly
                     # It's for structural analysis, not perfect data extraction.
                     value_str = f"0x{field_bytes.hex()}"
                     if field['size'] == 4 and field['def_num'] in [253, 4, 2, 7, 8, 0]: # Timestamps and time fields
                         try:
-                            ts = struct.unpack('>I', field_bytes)[0]
+                            ts = _U32BE(file_bytes, field_offset)[0]
                             value_str = f"{ts} (0x{field_bytes.hex()})"
                         except struct.error:
                             value_str = f"ERROR_UNPACKING ({value_str})"
                     
-                    print(f"      LMT {local_msg_type} | GMN {definition['global_msg_num']:<5} | Field {field['def_num']:<3} | Size {field['size']:<2} | Value: {value_str}")
+                    w(f"      LMT {local_msg_type} | GMN {definition['global_msg_num']:<5} | Field {field['def_num']:<3} | Size {field['size']:<2} | Value: {value_str}\n")
                     field_offset += field['size']
 
                 pointer += definition['total_size']
             else:
-                print(f"    ERROR: No definition found for Local Msg Type {local_msg_type}. Skipping.")
+                w(f"    ERROR: No definition found for Local Msg Type {local_msg_type}. Skipping.\n")
                 # This is tricky. We don't know how many bytes to skip.
                 # This script will likely fail here if a file isn't well-formed (defs first).
                 break
 
     # 3. File CRC
-    file_crc_bytes = file_bytes[header_size + data_size:]
-    if len(file_crc_bytes) == 2:
-        file_crc = struct.unpack('<H', file_crc_bytes)[0]
-        body_and_header = file_bytes[:header_size + data_size]
-        calculated_file_crc = get_crc(body_and_header)
-        print(f"\n--- Footer ---")
-        print(f"File CRC: {file_crc} (Calculated: {calculated_file_crc}) -> {'OK' if file_crc == calculated_file_crc else 'FAIL'}")
+    if len(file_bytes) - (header_size + data_size) == 2:
+        file_crc = _U16LE(file_bytes, header_size + data_size)[0]
+        # CRC the mapped bytes in place, without copying them out
+        with memoryview(file_bytes)[:header_size + data_size] as body_and_header:
+            calculated_file_crc = get_crc(body_and_header)
+        w(f"\n--- Footer ---\n")
+        w(f"File CRC: {file_crc} (Calculated: {calculated_file_crc}) -> {'OK' if file_crc == calculated_file_crc else 'FAIL'}\n")
     else:
-        print("\n--- Footer ---")
-        print("File CRC: Not found or incorrect length.")
+        w("\n--- Footer ---\n")
+        w("File CRC: Not found or incorrect length.\n")
 
 
 if __name__ == "__main__":
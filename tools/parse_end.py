@@ -1,16 +1,20 @@
 #!/usr/bin/env python3
 """Manually parse last messages in FIT file."""
-import glob
+import mmap
 import os
 
 # Auto-detect newest file
 test_data = r'd:\TYRE PREASSURE APP\tyre_preassure\test_data'
-fit_files = glob.glob(f'{test_data}/*.fit')
-path = max(fit_files, key=os.path.getmtime)
+# scandir entries carry their stat result, so there is no extra stat() per
+# file; lower() matches .FIT as well as .fit, like glob on Windows
+with os.scandir(test_data) as entries:
+    path = max((e for e in entries if e.name.lower().endswith('.fit')),
+               key=lambda e: e.stat().st_mtime).path
 print(f"Analyzing: {os.path.basename(path)}\n")
 
+# Map the file instead of reading it all in; only the pages scanned are loaded
 with open(path, 'rb') as f:
-    data = f.read()
+    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
 print("Scanning for session definition (local type 5):")
 print()
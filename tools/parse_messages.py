@@ -1,5 +1,10 @@
 #!/usr/bin/env python3
 """Parse FIT file messages manually"""
+import struct
+
+# Definition message header after the record byte:
+# reserved, architecture, global message number, field count
+_DEF_HDR = struct.Struct('<BBHB')
 
 with open('minimal_test.fit', 'rb') as f:
     data = f.read()
@@ -21,10 +26,7 @@ while offset < len(data) - 2:  # Stop before file CRC
     
     if is_definition:
         # Skip definition message (variable length)
-        reserved = data[offset+1]
-        arch = data[offset+2]
-        global_msg = int.from_bytes(data[offset+3:offset+5], 'little')
-        num_fields = data[offset+5]
+        reserved, arch, global_msg, num_fields = _DEF_HDR.unpack_from(data, offset + 1)
         print(f"  Global message: {global_msg}")
         print(f"  Fields: {num_fields}")
         # Each field = 3 bytes, plus header (6 bytes) + dev fields byte
@@ -5,6 +5,7 @@ with open(path, 'rb') as f:
     data = f.read()
 
 print("Last 20 bytes before file CRC:")
+lines = []
 for i in range(len(data) - 22, len(data)):
     b = data[i]
     binary = f"{b:08b}"
@@ -15,4 +16,5 @@ for i in range(len(data) - 22, len(data)):
         desc = " <-- Session definition header? (0x45 = 01000101b = local type 5)"
     elif b == 0x05:
         desc = " <-- Session data header? (0x05 = 00000101b = local type 5)"
-    print(f"{i:3d}: 0x{b:02x} = {binary}b {desc}")
+    lines.append(f"{i:3d}: 0x{b:02x} = {binary}b {desc}")
+print('\n'.join(lines))
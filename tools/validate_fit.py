@@ -1,20 +1,27 @@
 #!/usr/bin/env python3
 """Validate and display structure of our generated FIT file"""
 
-def crc16_ccitt(data):
-    crc = 0
-    for b in data:
-        crc ^= (b << 8) & 0xFFFF
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return crc
+import os
+import struct
+import sys
+
+# fit_crc.py and fit_io.py live at the repository root, one level up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+# CRC-16/CCITT (poly 0x1021), computed in C by binascii.crc_hqx
+from fit_crc import crc16_ccitt
+from fit_io import load_fit
+
+# Definition message header after the record byte:
+# reserved, architecture, global message number, field count
+_DEF_HDR = struct.Struct('<BBHB')
+
+# Message breakdown lines, formatted once per message
+_FMT_DEF = '   Msg {} @ offset {}: DEFINITION (local {}, global {}, {} fields, {} bytes)'.format
+_FMT_DATA = '   Msg {} @ offset {}: DATA (local type {})'.format
 
 file_path = r'minimal_test.fit'
-with open(file_path, 'rb') as f:
-    data = f.read()
+data = load_fit(file_path)
 
 print("=" * 80)
 print(f"FILE VALIDATION: {file_path}")
@@ -57,7 +64,7 @@ else:
 
 # Validate file CRC
 file_crc_read = data[-2] | (data[-1] << 8)
-file_crc_computed = crc16_ccitt(data[:-2])
+file_crc_computed = crc16_ccitt(memoryview(data)[:-2])
 print(f"\n3. FILE CRC:")
 print(f"   File CRC (read): 0x{file_crc_read:04X}")
 print(f"   File CRC (computed): 0x{file_crc_computed:04X}")
@@ -70,47 +77,47 @@ else:
 print(f"\n4. MESSAGE BREAKDOWN:")
 offset = 14
 msg_num = 0
+# Data message payload size per local type, filled in from the definitions
+# as they are walked; None until a local type has been defined
+sizes = [None] * 16
+# Lines are collected and printed in one go after the walk
+lines = []
 while offset < 14 + data_size:
     b = data[offset]
     if b & 0x80:  # Compressed timestamp header
-        print(f"   Offset {offset}: Compressed timestamp header (not used in our file)")
+        lines.append(f"   Offset {offset}: Compressed timestamp header (not used in our file)")
         offset += 1
     elif b & 0x40:  # Definition message
         local_type = b & 0x0F
-        reserved = data[offset + 1]
-        arch = data[offset + 2]
-        global_msg = data[offset + 3] | (data[offset + 4] << 8)
-        num_fields = data[offset + 5]
+        reserved, arch, global_msg, num_fields = _DEF_HDR.unpack_from(data, offset + 1)
         msg_size = 6 + (num_fields * 3)
+        # Size byte of each (field number, size, base type) triplet
+        payload_size = sum(data[offset + 6:offset + msg_size][1::3])
         
         # Check for developer fields
         dev_fields_offset = 6 + (num_fields * 3)
         if dev_fields_offset < len(data) - offset:
             num_dev_fields = data[offset + dev_fields_offset]
             msg_size += 1 + (num_dev_fields * 3)
+            # (field number, size, developer data index) triplets
+            payload_size += sum(data[offset + dev_fields_offset + 1:offset + msg_size][1::3])
+        sizes[local_type] = payload_size
         
         msg_num += 1
-        print(f"   Msg {msg_num} @ offset {offset}: DEFINITION (local {local_type}, global {global_msg}, {num_fields} fields, {msg_size} bytes)")
+        lines.append(_FMT_DEF(msg_num, offset, local_type, global_msg, num_fields, msg_size))
         offset += msg_size
     else:  # Data message
         local_type = b & 0x0F
-        # Need to find corresponding definition to know size
-        # For simplicity, let's show basic info
         msg_num += 1
-        print(f"   Msg {msg_num} @ offset {offset}: DATA (local type {local_type})")
+        lines.append(_FMT_DATA(msg_num, offset, local_type))
         
-        # Estimate size based on known definitions
-        if local_type == 0:  # file_id
-            offset += 1 + 14  # header + 5 fields (1+2+2+4+4)
-        elif local_type == 1:  # record
-            offset += 1 + 10  # header + 3 fields (4+4+2)
-        elif local_type == 2:  # session
-            offset += 1 + 19  # header + 7 fields (1+1+4+4+4+4+1)
-        elif local_type == 3:  # activity
-            offset += 1 + 11  # header + 4 fields (4+4+2+1)
-        else:
-            print(f"      Unknown local type, stopping parse")
+        size = sizes[local_type]
+        if size is None:
+            lines.append(f"      No definition for local type {local_type}, stopping parse")
             break
+        offset += 1 + size
+if lines:
+    print('\n'.join(lines))
 
 print(f"\n5. OVERALL VALIDATION:")
 all_ok = (header_crc_read == header_crc_computed and 
@@ -15,5 +15,5 @@ print()
 print("Last 50 bytes of file:")
 for i in range(len(data) - 50, len(data), 10):
     chunk = data[i:i+10]
-    hex_str = ' '.join(f'{b:02x}' for b in chunk)
+    hex_str = chunk.hex(' ')
     print(f"  {i:3d}: {hex_str}")
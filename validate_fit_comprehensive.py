@@ -4,36 +4,30 @@ Comprehensive FIT File Validator
 Verifies that generated FIT files conform to the Garmin FIT specification.
 """
 
+import os
 import struct
 import sys
 
-def garmin_fit_crc(data):
-    """Calculate CRC using Garmin's nibble-based algorithm"""
-    crc_table = [
-        0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
-        0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400,
-    ]
-    
-    crc = 0
-    for byte in data:
-        # Process lower nibble
-        tmp = crc_table[crc & 0xF]
-        crc = (crc >> 4) & 0x0FFF
-        crc = crc ^ tmp ^ crc_table[byte & 0xF]
-        
-        # Process upper nibble
-        tmp = crc_table[crc & 0xF]
-        crc = (crc >> 4) & 0x0FFF
-        crc = crc ^ tmp ^ crc_table[(byte >> 4) & 0xF]
-    
-    return crc
+from fit_crc import garmin_crc, garmin_header_crc
+from fit_io import load_fit
+
+# First 12 header bytes: header size, protocol version, profile version,
+# data size, '.FIT'. The generators here write profile and data size
+# big-endian; the header CRC that follows is little-endian
+_FIT_HEADER = struct.Struct('>BBHI4s')
 
 def validate_fit_file(filepath):
     """Validate a FIT file"""
     try:
-        with open(filepath, 'rb') as f:
-            data = f.read()
-        
+        data = load_fit(filepath)
+    except Exception as e:
+        print(f"✗ ERROR: {e}")
+        return False
+    return validate_fit_data(filepath, data)
+
+def validate_fit_data(filepath, data):
+    """Validate FIT file contents already in memory (any bytes-like object)"""
+    try:
         print(f"\n{'='*60}")
         print(f"FIT File: {filepath}")
         print(f"{'='*60}")
@@ -44,11 +38,9 @@ def validate_fit_file(filepath):
             print("✗ ERROR: File too short for header")
             return False
         
-        header_size = data[0]
-        protocol_version = data[1]
-        profile_version = struct.unpack('>H', data[2:4])[0]
-        data_size = struct.unpack('>I', data[4:8])[0]
-        data_type = bytes(data[8:12]).decode('ascii', errors='ignore')
+        (header_size, protocol_version, profile_version, data_size,
+         data_type) = _FIT_HEADER.unpack_from(data, 0)
+        data_type = data_type.decode('ascii', errors='ignore')
         
         print(f"\nHeader Information:")
         print(f"  Header Size:      {header_size} bytes")
@@ -69,9 +61,9 @@ def validate_fit_file(filepath):
             return False
         
         # Verify header CRC
-        header_data = data[:header_size-2]
-        header_crc_stored = struct.unpack('<H', data[header_size-2:header_size])[0]
-        header_crc_calc = garmin_fit_crc(header_data)
+        header_data = memoryview(data)[:header_size-2]
+        header_crc_stored = struct.unpack_from('<H', data, header_size-2)[0]
+        header_crc_calc = garmin_header_crc(header_data)
         
         print(f"\nCRC Verification:")
         print(f"  Header CRC:")
@@ -84,8 +76,8 @@ def validate_fit_file(filepath):
             return False
         
         # Verify file CRC
-        file_crc_stored = struct.unpack('<H', data[-2:])[0]
-        file_crc_calc = garmin_fit_crc(data[:-2])
+        file_crc_stored = struct.unpack_from('<H', data, len(data) - 2)[0]
+        file_crc_calc = garmin_crc(memoryview(data)[:-2])
         
         print(f"  File CRC:")
         print(f"    Stored:     0x{file_crc_stored:04x}")
@@ -105,21 +97,37 @@ def validate_fit_file(filepath):
         print(f"✗ ERROR: {e}")
         return False
 
+def validate_directory(path):
+    """Validate every .fit file in a directory; returns {filepath: valid}"""
+    # scandir entries carry their file type, so there is no extra stat() per
+    # file; lower() matches .FIT as well as .fit on every platform
+    with os.scandir(path) as entries:
+        paths = sorted(e.path for e in entries
+                       if e.is_file() and e.name.lower().endswith('.fit'))
+    return {filepath: validate_fit_file(filepath) for filepath in paths}
+
 if __name__ == '__main__':
-    files = [
-        'test_minimal.fit',
-        'test_fixed_writer.fit', 
-        'test_comprehensive.fit',
-        'dart_test_output.fit',
-    ]
-    
-    results = {}
-    for filepath in files:
-        try:
-            results[filepath] = validate_fit_file(filepath)
-        except FileNotFoundError:
-            print(f"\n✗ File not found: {filepath}")
-            results[filepath] = False
+    if len(sys.argv) > 1:
+        # Validate a whole directory, e.g. test_data/
+        results = validate_directory(sys.argv[1])
+        if not results:
+            print(f"✗ No .fit files found in {sys.argv[1]}")
+            sys.exit(1)
+    else:
+        files = [
+            'test_minimal.fit',
+            'test_fixed_writer.fit', 
+            'test_comprehensive.fit',
+            'dart_test_output.fit',
+        ]
+        
+        results = {}
+        for filepath in files:
+            try:
+                results[filepath] = validate_fit_file(filepath)
+            except FileNotFoundError:
+                print(f"\n✗ File not found: {filepath}")
+                results[filepath] = False
     
     # Summary
     print(f"\n\n{'='*60}")
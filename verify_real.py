@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 import struct
 
-with open('test_data/coast_down_20260129_223459.fit', 'rb') as f:
-    content = f.read()
-    
+from fit_io import load_fit
+
+content = load_fit('test_data/coast_down_20260129_223459.fit')
+
 total_size = len(content)
 header = content[:14]
 footer_crc = content[-2:]
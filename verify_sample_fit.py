@@ -1,26 +1,19 @@
 import struct
 
-def garmin_crc(data):
-    """Calculate CRC using Garmin's nibble-based algorithm"""
-    crc_table = [
-        0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
-        0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400,
-    ]
-    crc = 0
-    for byte in data:
-        tmp = crc_table[crc & 0xF]
-        crc = (crc >> 4) & 0x0FFF
-        crc = crc ^ tmp ^ crc_table[byte & 0xF]
-        tmp = crc_table[crc & 0xF]
-        crc = (crc >> 4) & 0x0FFF
-        crc = crc ^ tmp ^ crc_table[(byte >> 4) & 0xF]
-    return crc
+from fit_io import load_fit
+
+# First 12 header bytes: header size, protocol version, profile version,
+# data size, '.FIT'. The generators here write profile and data size
+# big-endian; the header CRC that follows is little-endian
+_FIT_HEADER = struct.Struct('>BBHI4s')
+
+# Maps each byte to itself if printable ASCII, else '.', for bytes.translate
+_PRINTABLE = bytes(b if 32 <= b < 127 else 0x2E for b in range(256))
 
 def validate_fit_file(filepath):
     """Validate a FIT file against Garmin specification"""
     try:
-        with open(filepath, 'rb') as f:
-            data = f.read()
+        data = load_fit(filepath)
         
         print(f"{'='*60}")
         print(f"FIT File Validation: {filepath}")
@@ -32,12 +25,10 @@ def validate_fit_file(filepath):
             print("✗ ERROR: File too short for 14-byte header")
             return False
         
-        header_size = data[0]
-        protocol_version = data[1]
-        profile_version = struct.unpack('>H', data[2:4])[0]  # BIG-ENDIAN per spec
-        data_size = struct.unpack('>I', data[4:8])[0]  # BIG-ENDIAN per spec
-        data_type = bytes(data[8:12]).decode('ascii', errors='ignore')
-        header_crc_stored = struct.unpack('<H', data[12:14])[0]  # LITTLE-ENDIAN per spec
+        (header_size, protocol_version, profile_version, data_size,
+         data_type) = _FIT_HEADER.unpack_from(data, 0)
+        data_type = data_type.decode('ascii', errors='ignore')
+        header_crc_stored = struct.unpack_from('<H', data, 12)[0]  # LITTLE-ENDIAN per spec
         
         print(f"\nHeader Information (per Garmin FIT Spec Table 1):")
         print(f"  Header Size:        {header_size} bytes")
@@ -89,10 +80,11 @@ def validate_fit_file(filepath):
         
         # Hex dump
         print(f"\nHex Dump:")
+        lines = []
         for i in range(0, len(data), 16):
-            hex_str = ' '.join(f'{b:02x}' for b in data[i:i+16])
-            ascii_str = ''.join(chr(b) if 32 <= b < 127 else '.' for b in data[i:i+16])
-            print(f"  {i:04x}: {hex_str:48} {ascii_str}")
+            chunk = data[i:i+16]
+            lines.append(f"  {i:04x}: {chunk.hex(' '):48} {chunk.translate(_PRINTABLE).decode('ascii')}")
+        print('\n'.join(lines))
         
         return True
     
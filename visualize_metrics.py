@@ -6,7 +6,6 @@ Shows why multi-factor model is needed.
 
 import json
 from pathlib import Path
-from collections import defaultdict
 import math
 
 
@@ -17,21 +16,54 @@ def visualize_metrics():
     sensor_path = f'{fit_path}.sensor_records.jsonl'
     metadata_path = f'{fit_path}.jsonl'
     
-    # Load data
-    sensor_records = defaultdict(list)
+    # Load data. Per-lap speed/heart-rate stats are accumulated as each line
+    # is read, so the sensor records are never held in memory; the speed
+    # variance uses Welford's update to stay accurate in a single pass.
+    # Each stat is its own list indexed by lap (laps 1-11), rather than a
+    # dict per lap looked up by key for every record
+    num_laps = 12
+    count = [0] * num_laps
+    mean = [0.0] * num_laps
+    m2 = [0.0] * num_laps
+    first = [0.0] * num_laps
+    last = [0.0] * num_laps
+    lo = [math.inf] * num_laps
+    hi = [-math.inf] * num_laps
+    hr_sum = [0] * num_laps
+    hr_n = [0] * num_laps
     with open(sensor_path, 'r') as f:
         for line in f:
             try:
-                record = json.loads(line.strip())
-                sensor_records[record['lapIndex']].append(record)
+                record = json.loads(line)
+                lap_idx = record['lapIndex']
             except:
                 continue
+            if not 1 <= lap_idx <= 11:
+                continue
+            lap_idx = int(lap_idx)
+            speed = record['speed_kmh']
+            n = count[lap_idx] + 1
+            if n == 1:
+                first[lap_idx] = speed
+            delta = speed - mean[lap_idx]
+            mean[lap_idx] += delta / n
+            m2[lap_idx] += delta * (speed - mean[lap_idx])
+            count[lap_idx] = n
+            last[lap_idx] = speed
+            if speed < lo[lap_idx]:
+                lo[lap_idx] = speed
+            if speed > hi[lap_idx]:
+                hi[lap_idx] = speed
+            hr = record.get('heart_rate', 0)
+            if hr > 0:
+                hr_sum[lap_idx] += hr
+                hr_n[lap_idx] += 1
     
     metadata = {}
     with open(metadata_path, 'r') as f:
         for line in f:
             try:
-                record = json.loads(line.strip())
+                record = json.loads(line)
                 metadata[record['lapIndex']] = record
             except:
                 continue
@@ -41,29 +73,24 @@ def visualize_metrics():
     print("="*120 + "\n")
     
     results = []
-    for lap_idx in sorted([k for k in sensor_records.keys() if 1 <= k <= 11]):
-        records = sensor_records[lap_idx]
-        if not records:
+    for lap_idx in range(num_laps):
+        n = count[lap_idx]
+        if not n:
             continue
         
         pres = metadata.get(lap_idx)
         pressure = pres['frontPressure'] if pres else 0
         
-        speeds = [r['speed_kmh'] for r in records]
-        deceleration = (speeds[0] - speeds[-1]) / len(records) if len(records) > 0 else 0
+        deceleration = (first[lap_idx] - last[lap_idx]) / n
         vib_avg = pres['vibrationAvg'] if pres else 0
         vib_max = pres['vibrationMax'] if pres else 0
         
-        speed_variance = 0.0
-        if len(speeds) > 1:
-            avg_speed = sum(speeds) / len(speeds)
-            speed_variance = math.sqrt(sum((s - avg_speed) ** 2 for s in speeds) / len(speeds))
+        speed_variance = math.sqrt(m2[lap_idx] / n) if n > 1 else 0.0
         
-        max_speed = max(speeds) if speeds else 0
-        min_speed = min(speeds) if speeds else 0
+        max_speed = hi[lap_idx]
+        min_speed = lo[lap_idx]
         
-        hr_values = [r.get('heart_rate', 0) for r in records if r.get('heart_rate', 0) > 0]
-        avg_hr = sum(hr_values) / len(hr_values) if hr_values else 0
+        avg_hr = hr_sum[lap_idx] / hr_n[lap_idx] if hr_n[lap_idx] else 0
         
         results.append({
             'pressure': pressure,
@@ -85,13 +112,10 @@ def visualize_metrics():
         if min_val == max_val:
             return [50] * len(values)
         
-        normalized = []
-        for v in values:
-            n = (v - min_val) / (max_val - min_val) * 100
-            if inverse:  # Lower is better
-                n = 100 - n
-            normalized.append(n)
-        return normalized
+        span = max_val - min_val
+        if inverse:  # Lower is better
+            return [100 - (v - min_val) / span * 100 for v in values]
+        return [(v - min_val) / span * 100 for v in values]
     
     # Get normalized values
     pressures = [r['pressure'] for r in results]